@@ -1,4 +1,10 @@
 """Config module initialization"""
-from .settings import settings, Settings, SIGNAL_TEMPLATE
+from .settings import (
+    settings, Settings, get_settings, SIGNAL_TEMPLATE, STATS_TEMPLATE,
+    SETTINGS_TEMPLATE, PAPER_TEMPLATE, PAPER_TRADE_TEMPLATE
+)
 
-__all__ = ["settings", "Settings", "SIGNAL_TEMPLATE"]
\ No newline at end of file
+__all__ = [
+    "settings", "Settings", "get_settings", "SIGNAL_TEMPLATE", "STATS_TEMPLATE",
+    "SETTINGS_TEMPLATE", "PAPER_TEMPLATE", "PAPER_TRADE_TEMPLATE"
+]
\ No newline at end of file
@@ -0,0 +1,14 @@
+"""
+Optional numba JIT, with a pass-through njit when numba is not installed
+"""
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # kernels stay importable and run as plain Python
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Return the function unchanged; supports both @njit and @njit(...)"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
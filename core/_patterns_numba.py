@@ -0,0 +1,43 @@
+"""
+Numba kernel that detects every candlestick pattern in a single pass
+"""
+import numpy as np
+
+from core._njit import njit
+
+
+@njit(cache=True, boundscheck=False)
+def detect_all(o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray,
+               hammer: np.ndarray, shooting_star: np.ndarray, engulfing: np.ndarray,
+               morning_star: np.ndarray, evening_star: np.ndarray) -> None:
+    """Fill the preallocated pattern arrays, matching TechnicalIndicators.detect_*"""
+    prev2_body = 0.0
+    prev_body = 0.0
+
+    for i in range(len(c)):
+        body = abs(c[i] - o[i])
+
+        if i >= 1:
+            upper_shadow = h[i] - max(c[i], o[i])
+            lower_shadow = min(c[i], o[i]) - l[i]
+
+            if body > 0 and lower_shadow > 2 * body and upper_shadow < body and c[i] > o[i]:
+                hammer[i] = 100
+            if body > 0 and upper_shadow > 2 * body and lower_shadow < body and c[i] < o[i]:
+                shooting_star[i] = 100
+
+            if (c[i] > o[i] and c[i - 1] < o[i - 1] and
+                    c[i] >= o[i - 1] and o[i] <= c[i - 1]):
+                engulfing[i] = 100
+            elif (c[i] < o[i] and c[i - 1] > o[i - 1] and
+                    c[i] <= o[i - 1] and o[i] >= c[i - 1]):
+                engulfing[i] = -100
+
+        if i >= 2 and prev_body < 0.3 * prev2_body and body > prev2_body:
+            if c[i - 2] < o[i - 2] and c[i] > o[i]:
+                morning_star[i] = 100
+            elif c[i - 2] > o[i - 2] and c[i] < o[i]:
+                evening_star[i] = 100
+
+        prev2_body = prev_body
+        prev_body = body
@@ -0,0 +1,46 @@
+"""
+Numba kernels for the exponential and Wilder recurrences behind EMA, RSI and ATR
+"""
+import numpy as np
+
+from core._njit import njit
+
+
+@njit(cache=True)
+def ewm_mean(x: np.ndarray, alpha: float, min_periods: int, out: np.ndarray) -> None:
+    """Fill out with pandas' ewm(alpha=alpha, adjust=False).mean() of a NaN-free x"""
+    old_wt = 1.0 - alpha
+    weighted = x[0]
+    out[0] = weighted if min_periods <= 1 else np.nan
+    
+    for i in range(1, len(x)):
+        # Same operation order as pandas, so results match bit for bit
+        weighted = (old_wt * weighted + alpha * x[i]) / (old_wt + alpha)
+        out[i] = weighted if i + 1 >= min_periods else np.nan
+
+
+@njit(cache=True)
+def wilder_mean(x: np.ndarray, period: int, seed: float, out: np.ndarray) -> None:
+    """Fill out like ta's AverageTrueRange: zeros, the seed at period - 1, then Wilder smoothing"""
+    out[:period - 1] = 0.0
+    out[period - 1] = seed
+    for i in range(period, len(x)):
+        out[i] = (out[i - 1] * (period - 1) + x[i]) / float(period)
+
+
+@njit(cache=True)
+def ewm_mean_many(x: np.ndarray, alphas: np.ndarray, min_periods: np.ndarray,
+                  out: np.ndarray) -> None:
+    """ewm_mean for several alphas in one pass over x; out has one row per alpha"""
+    k = len(alphas)
+    weighted = np.empty(k)
+    for j in range(k):
+        weighted[j] = x[0]
+        out[j, 0] = x[0] if min_periods[j] <= 1 else np.nan
+    
+    for i in range(1, len(x)):
+        value = x[i]
+        for j in range(k):
+            old_wt = 1.0 - alphas[j]
+            weighted[j] = (old_wt * weighted[j] + alphas[j] * value) / (old_wt + alphas[j])
+            out[j, i] = weighted[j] if i + 1 >= min_periods[j] else np.nan
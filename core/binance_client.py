@@ -3,77 +3,265 @@ Binance API client for fetching market data
 """
 import asyncio
 import logging
-from typing import List, Dict, Optional
+import random
+import time
+from operator import itemgetter
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
+import numpy as np
+import orjson
 import pandas as pd
 from binance.client import AsyncClient
 from binance.exceptions import BinanceAPIException
 import aiohttp
 
 from config.settings import settings
+from core.indicators import OHLCV
+from core.websocket_handler import ws_handler
 
 logger = logging.getLogger(__name__)
 
 
+class TokenBucket:
+    """Request-weight budget that refills continuously up to its per-minute capacity"""
+    
+    def __init__(self, capacity: int, period: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+    
+    async def acquire(self, weight: int = 1):
+        """Wait until the budget covers the request weight, then spend it"""
+        async with self._lock:
+            self._refill()
+            if self.tokens < weight:
+                await asyncio.sleep((weight - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= weight
+    
+    def sync(self, used_weight: Optional[int] = None, retry_after: Optional[float] = None):
+        """Clamp the budget to what the server reports as already used"""
+        self._refill()
+        if used_weight is not None:
+            self.tokens = min(self.tokens, self.capacity - used_weight)
+        if retry_after is not None:
+            # Go into debt so nothing is sent until the ban window has passed
+            self.tokens = min(self.tokens, -retry_after * self.rate)
+
+
+# Fields read from each futures force order, fetched in one C-level call
+LIQUIDATION_FIELDS = itemgetter('price', 'origQty', 'side', 'time')
+
+# Throttling and transient server errors worth retrying; 418 (IP ban) is not
+RETRYABLE_STATUS = frozenset((429, 500, 502, 503, 504))
+
+
+# Kline interval lengths; bars open on multiples of these since the epoch
+INTERVAL_SECONDS = {
+    '1m': 60, '3m': 180, '5m': 300, '15m': 900, '30m': 1800,
+    '1h': 3600, '2h': 7200, '4h': 14400, '6h': 21600, '8h': 28800,
+    '12h': 43200, '1d': 86400
+}
+
+
+class WeightTrackingClient(AsyncClient):
+    """AsyncClient that reports every response it handles before parsing it"""
+    
+    # python-binance keeps only the latest response on self.response, which
+    # concurrent requests overwrite; this sees each one individually
+    on_response: Optional[Callable[[aiohttp.ClientResponse], None]] = None
+    
+    async def _handle_response(self, response: aiohttp.ClientResponse):
+        if self.on_response is not None:
+            self.on_response(response)
+        return await super()._handle_response(response)
+
+
+def _klines_weight(limit: int) -> int:
+    """Request weight of /api/v3/klines for a given limit"""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
 class BinanceClient:
     """Async Binance API client"""
     
     def __init__(self):
         self.client: Optional[AsyncClient] = None
         self.session: Optional[aiohttp.ClientSession] = None
-        self.rate_limiter = asyncio.Semaphore(settings.BINANCE_RATE_LIMIT)
+        self.connector: Optional[aiohttp.TCPConnector] = None
+        self.spot_weight = TokenBucket(settings.BINANCE_RATE_LIMIT)
+        self.futures_weight = TokenBucket(settings.BINANCE_FUTURES_RATE_LIMIT)
+        self.rate_limiter = asyncio.Semaphore(settings.BINANCE_MAX_CONCURRENCY)
+        self._cache: Dict[Tuple, Tuple[float, Any]] = {}
+        self._cache_locks: Dict[Tuple, asyncio.Lock] = {}
+        # USDT-margined perpetuals trade under the spot symbol name
+        self._futures_symbols: Dict[str, str] = {pair: pair for pair in settings.TRADING_PAIRS}
+        self._ws_task: Optional[asyncio.Task] = None
         
     async def initialize(self):
         """Initialize Binance client"""
         try:
-            self.client = await AsyncClient.create(
+            # One keep-alive pool shared by python-binance and the direct REST
+            # calls, so every request reuses the same TCP/TLS connections
+            self.connector = aiohttp.TCPConnector(
+                limit=settings.BINANCE_HTTP_POOL_SIZE,
+                limit_per_host=settings.BINANCE_HTTP_POOL_SIZE,
+                keepalive_timeout=90,
+                ttl_dns_cache=600,
+                enable_cleanup_closed=True
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=settings.BINANCE_HTTP_TIMEOUT,
+                connect=3
+            )
+            
+            self.client = await WeightTrackingClient.create(
                 api_key=settings.BINANCE_API_KEY,
                 api_secret=settings.BINANCE_SECRET,
-                testnet=settings.BINANCE_TESTNET
+                testnet=settings.BINANCE_TESTNET,
+                session_params={
+                    'connector': self.connector,
+                    'connector_owner': False,
+                    'timeout': timeout
+                }
             )
-            self.session = aiohttp.ClientSession()
+            self.client.on_response = self._sync_response_weight
+            self.session = aiohttp.ClientSession(
+                connector=self.connector,
+                connector_owner=False,
+                timeout=timeout
+            )
+            # Kline streams keep live bars current so scans can skip REST polling
+            self._ws_task = asyncio.create_task(ws_handler.start())
             logger.info("Binance client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Binance client: {e}")
+            if self.connector:
+                await self.connector.close()
             raise
     
     async def close(self):
         """Close Binance client"""
+        if self._ws_task:
+            await ws_handler.stop()
+            self._ws_task.cancel()
         if self.client:
             await self.client.close_connection()
         if self.session:
             await self.session.close()
+        if self.connector:
+            await self.connector.close()
         logger.info("Binance client closed")
     
-    async def _rate_limited_request(self, func, *args, **kwargs):
-        """Execute request with rate limiting"""
-        async with self.rate_limiter:
-            return await func(*args, **kwargs)
+    async def _rate_limited_request(self, func, *args, weight: int = 1,
+                                    futures: bool = False, **kwargs):
+        """Execute request within the request-weight budget, retrying transient failures"""
+        bucket = self.futures_weight if futures else self.spot_weight
+        
+        for attempt in range(settings.BINANCE_REQUEST_ATTEMPTS):
+            # A Retry-After from the previous attempt has put the bucket in
+            # debt, so this waits out the server's window before resending
+            await bucket.acquire(weight)
+            try:
+                # Usage headers are synced per response, by the client hook or
+                # by the direct REST helpers, never from shared client state
+                async with self.rate_limiter:
+                    return await func(*args, **kwargs)
+            except BinanceAPIException as e:
+                if e.status_code not in RETRYABLE_STATUS or attempt == settings.BINANCE_REQUEST_ATTEMPTS - 1:
+                    raise
+                error = e
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == settings.BINANCE_REQUEST_ATTEMPTS - 1:
+                    raise
+                error = e
+            
+            delay = 0.5 * 2 ** attempt * (0.5 + random.random())
+            logger.warning(f"Binance request failed ({type(error).__name__}: {error}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+    
+    async def _cached(self, key: Tuple, ttl: float,
+                      fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return a fresh cached value, letting one caller fetch it on a miss"""
+        entry = self._cache.get(key)
+        if entry and time.monotonic() < entry[0]:
+            return entry[1]
+        
+        lock = self._cache_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._cache.get(key)
+            if entry and time.monotonic() < entry[0]:
+                return entry[1]
+            
+            value = await fetch()
+            self._cache[key] = (time.monotonic() + ttl, value)
+            return value
+    
+    @staticmethod
+    def _bar_ttl(interval: str) -> float:
+        """Seconds until the current bar of an interval closes"""
+        seconds = INTERVAL_SECONDS.get(interval)
+        if seconds is None:
+            return 60.0
+        now = time.time()
+        return (now // seconds + 1) * seconds - now
+    
+    def _sync_response_weight(self, response: aiohttp.ClientResponse):
+        """Charge a python-binance response's usage headers to its own API's budget"""
+        # USD-M futures live under /fapi on both the live and testnet hosts
+        futures = response.url.path.startswith('/fapi/')
+        self._sync_weight(response.headers, self.futures_weight if futures else self.spot_weight)
+    
+    def _sync_weight(self, headers, bucket: TokenBucket):
+        """Update a weight budget from Binance's usage and ban headers"""
+        used = headers.get('X-MBX-USED-WEIGHT-1M')
+        retry_after = headers.get('Retry-After')
+        if retry_after is not None:
+            logger.warning(f"Binance rate limit hit, backing off {retry_after}s")
+        bucket.sync(
+            used_weight=int(used) if used is not None else None,
+            retry_after=float(retry_after) if retry_after is not None else None
+        )
+    
+    async def _klines_raw(self, symbol: str, interval: str, limit: int) -> List[List]:
+        """Fetch raw klines over the shared aiohttp session"""
+        url = f"{settings.get_binance_endpoint()}/v3/klines"
+        params = {'symbol': symbol, 'interval': interval, 'limit': limit}
+        
+        async with self.session.get(url, params=params) as response:
+            self._sync_weight(response.headers, self.spot_weight)
+            if response.status != 200:
+                raise BinanceAPIException(response, response.status, await response.text())
+            return orjson.loads(await response.read())
     
     async def get_klines(self, symbol: str, interval: str, 
                         limit: int = 500) -> pd.DataFrame:
-        """Get historical klines/candlestick data"""
+        """Get klines from the live stream buffer, else REST cached until the bar closes"""
+        live = ws_handler.get_klines(symbol, interval, limit)
+        if live is not None:
+            return live
+        
         try:
-            klines = await self._rate_limited_request(
-                self.client.get_klines,
-                symbol=symbol,
-                interval=interval,
-                limit=limit
+            df = await self._cached(
+                ('klines', symbol, interval, limit),
+                self._bar_ttl(interval),
+                lambda: self._fetch_klines(symbol, interval, limit)
             )
-            
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-                'taker_buy_quote', 'ignore'
-            ])
-            
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                df[col] = df[col].astype(float)
-            
-            df.set_index('timestamp', inplace=True)
-            
-            return df[['open', 'high', 'low', 'close', 'volume']]
+            # Callers add indicator columns in place
+            return df.copy()
             
         except BinanceAPIException as e:
             logger.error(f"Binance API error for {symbol} {interval}: {e}")
@@ -82,12 +270,50 @@ class BinanceClient:
             logger.error(f"Error fetching klines for {symbol} {interval}: {e}")
             raise
     
+    async def get_ohlcv(self, symbol: str, interval: str, limit: int = 500) -> OHLCV:
+        """Get klines as columnar arrays for the array indicator API"""
+        return OHLCV.from_frame(await self.get_klines(symbol, interval, limit))
+    
+    async def _fetch_klines(self, symbol: str, interval: str, limit: int) -> pd.DataFrame:
+        """Download klines and parse them into an OHLCV frame"""
+        klines = await self._rate_limited_request(
+            self._klines_raw,
+            symbol,
+            interval,
+            limit,
+            weight=_klines_weight(limit)
+        )
+        
+        # Only open time and OHLCV are used; parse them in one pass
+        arr = np.array([k[:6] for k in klines], dtype=np.float64).reshape(-1, 6)
+        # ms open times -> datetime64[ns] by integer scaling, no datetime parsing
+        ts_ns = arr[:, 0].astype(np.int64) * 1_000_000
+        index = pd.DatetimeIndex(ts_ns.view('datetime64[ns]'), name='timestamp')
+        # Stored as float32 to halve the window footprint; the indicator
+        # kernels upcast to float64 at their input boundary
+        prices = arr[:, 1:].astype(np.float32)
+        
+        df = pd.DataFrame({
+            'open': prices[:, 0],
+            'high': prices[:, 1],
+            'low': prices[:, 2],
+            'close': prices[:, 3],
+            'volume': prices[:, 4]
+        }, index=index, copy=False)
+        ws_handler.seed_klines(symbol, interval, df)
+        return df
+    
     async def get_ticker_price(self, symbol: str) -> float:
-        """Get current ticker price"""
+        """Get current ticker price from the live streams, else REST"""
+        live = ws_handler.get_last_price(symbol)
+        if live is not None:
+            return live
+        
         try:
             ticker = await self._rate_limited_request(
                 self.client.get_symbol_ticker,
-                symbol=symbol
+                symbol=symbol,
+                weight=2
             )
             return float(ticker['price'])
         except Exception as e:
@@ -97,12 +323,17 @@ class BinanceClient:
     async def get_funding_rate(self, symbol: str) -> Optional[float]:
         """Get current funding rate for perpetual futures"""
         try:
-            futures_symbol = symbol.replace('USDT', 'USDT')
+            futures_symbol = self._futures_symbols.get(symbol, symbol)
             
-            premium_index = await self._rate_limited_request(
-                self.client.futures_funding_rate,
-                symbol=futures_symbol,
-                limit=1
+            premium_index = await self._cached(
+                ('funding', futures_symbol),
+                settings.BINANCE_FUNDING_CACHE_TTL,
+                lambda: self._rate_limited_request(
+                    self.client.futures_funding_rate,
+                    symbol=futures_symbol,
+                    limit=1,
+                    futures=True
+                )
             )
             
             if premium_index:
@@ -116,11 +347,16 @@ class BinanceClient:
     async def get_open_interest(self, symbol: str) -> Optional[Dict]:
         """Get open interest data"""
         try:
-            futures_symbol = symbol.replace('USDT', 'USDT')
+            futures_symbol = self._futures_symbols.get(symbol, symbol)
             
-            oi = await self._rate_limited_request(
-                self.client.futures_open_interest,
-                symbol=futures_symbol
+            oi = await self._cached(
+                ('open_interest', futures_symbol),
+                settings.BINANCE_OI_CACHE_TTL,
+                lambda: self._rate_limited_request(
+                    self.client.futures_open_interest,
+                    symbol=futures_symbol,
+                    futures=True
+                )
             )
             
             return {
@@ -135,22 +371,28 @@ class BinanceClient:
     async def get_liquidations(self, symbol: str) -> List[Dict]:
         """Get recent liquidation data"""
         try:
-            futures_symbol = symbol.replace('USDT', 'USDT')
+            futures_symbol = self._futures_symbols.get(symbol, symbol)
             
-            liquidations = await self._rate_limited_request(
-                self.client.futures_force_orders,
-                symbol=futures_symbol,
-                limit=100
+            liquidations = await self._cached(
+                ('liquidations', futures_symbol),
+                settings.BINANCE_LIQUIDATIONS_CACHE_TTL,
+                lambda: self._rate_limited_request(
+                    self.client.futures_force_orders,
+                    symbol=futures_symbol,
+                    limit=100,
+                    weight=20,
+                    futures=True
+                )
             )
             
             return [
                 {
-                    'price': float(liq['price']),
-                    'quantity': float(liq['origQty']),
-                    'side': liq['side'],
-                    'time': datetime.fromtimestamp(liq['time'] / 1000)
+                    'price': float(price),
+                    'quantity': float(quantity),
+                    'side': side,
+                    'time': datetime.fromtimestamp(ms / 1000)
                 }
-                for liq in liquidations
+                for price, quantity, side, ms in map(LIQUIDATION_FIELDS, liquidations)
             ]
             
         except Exception as e:
@@ -160,9 +402,14 @@ class BinanceClient:
     async def get_24h_volume(self, symbol: str) -> float:
         """Get 24-hour trading volume"""
         try:
-            ticker = await self._rate_limited_request(
-                self.client.get_ticker,
-                symbol=symbol
+            ticker = await self._cached(
+                ('ticker_24h', symbol),
+                settings.BINANCE_TICKER_CACHE_TTL,
+                lambda: self._rate_limited_request(
+                    self.client.get_ticker,
+                    symbol=symbol,
+                    weight=2
+                )
             )
             return float(ticker['volume'])
         except Exception as e:
@@ -173,37 +420,87 @@ class BinanceClient:
                                    days: int = 30) -> float:
         """Calculate correlation between two symbols"""
         try:
-            df1 = await self.get_klines(symbol1, '1h', limit=days*24)
-            df2 = await self.get_klines(symbol2, '1h', limit=days*24)
-            
-            returns1 = df1['close'].pct_change().dropna()
-            returns2 = df2['close'].pct_change().dropna()
-            
-            aligned = pd.concat([returns1, returns2], axis=1, join='inner')
-            corr = aligned.corr().iloc[0, 1]
-            
-            return corr
-            
+            df1, df2 = await asyncio.gather(
+                self.get_klines(symbol1, '1h', limit=days*24),
+                self.get_klines(symbol2, '1h', limit=days*24)
+            )
+            return self._pearson(*self._close_returns(df1), *self._close_returns(df2))
         except Exception as e:
             logger.error(f"Error calculating correlation: {e}")
             return 0.0
     
-    async def fetch_all_pairs_data(self, timeframe: str) -> Dict[str, pd.DataFrame]:
-        """Fetch data for all trading pairs"""
-        tasks = []
-        for pair in settings.TRADING_PAIRS:
-            tasks.append(self.get_klines(pair, timeframe))
+    async def calculate_correlations(self, base: str, symbols: List[str],
+                                     days: int = 30) -> Dict[str, float]:
+        """Correlate several symbols with one base symbol, processing the base once"""
+        limit = days * 24
+        frames = await asyncio.gather(
+            *(self.get_klines(symbol, '1h', limit=limit) for symbol in (base, *symbols)),
+            return_exceptions=True
+        )
+        if isinstance(frames[0], Exception):
+            logger.error(f"Error calculating correlations against {base}: {frames[0]}")
+            return {symbol: 0.0 for symbol in symbols}
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        data = {}
-        for pair, result in zip(settings.TRADING_PAIRS, results):
-            if isinstance(result, Exception):
-                logger.error(f"Failed to fetch data for {pair}: {result}")
+        base_returns, base_ts = self._close_returns(frames[0])
+        correlations = {}
+        for symbol, df in zip(symbols, frames[1:]):
+            if isinstance(df, Exception):
+                logger.error(f"Error calculating correlation for {symbol}: {df}")
+                correlations[symbol] = 0.0
             else:
-                data[pair] = result
+                correlations[symbol] = self._pearson(base_returns, base_ts, *self._close_returns(df))
+        return correlations
+    
+    @staticmethod
+    def _pearson(r1: np.ndarray, ts1: np.ndarray, r2: np.ndarray, ts2: np.ndarray) -> float:
+        """Pearson r of two return series paired by bar open time, 0.0 if undefined"""
+        # Pair the returns by bar open time, as an inner join would
+        _, i1, i2 = np.intersect1d(ts1, ts2, assume_unique=True, return_indices=True)
+        if len(i1) < 2:
+            return 0.0
+        
+        d1 = r1[i1] - r1[i1].mean()
+        d2 = r2[i2] - r2[i2].mean()
+        denom = np.sqrt(np.dot(d1, d1) * np.dot(d2, d2))
+        if denom == 0:
+            return 0.0
         
-        return data
+        return float(np.dot(d1, d2) / denom)
+    
+    @staticmethod
+    def _close_returns(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Simple close-to-close returns and the open time of each return's bar"""
+        close = df['close'].to_numpy(dtype=np.float64)
+        return np.diff(close) / close[:-1], df.index.asi8[1:]
+    
+    async def _fetch_pair(self, pair: str, timeframe: str) -> Tuple[str, Any]:
+        """Fetch one pair's klines, returning the error instead of raising"""
+        try:
+            return pair, await self.get_klines(pair, timeframe)
+        except Exception as e:
+            return pair, e
+    
+    async def stream_all_pairs_data(self, timeframe: str) -> AsyncIterator[Tuple[str, pd.DataFrame]]:
+        """Yield (pair, klines) for all trading pairs as each fetch completes"""
+        tasks = [
+            asyncio.create_task(self._fetch_pair(pair, timeframe))
+            for pair in settings.TRADING_PAIRS
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                pair, result = await next_done
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to fetch data for {pair}: {result}")
+                else:
+                    yield pair, result
+        finally:
+            # A consumer that stops early must not leave fetches running
+            for task in tasks:
+                task.cancel()
+    
+    async def fetch_all_pairs_data(self, timeframe: str) -> Dict[str, pd.DataFrame]:
+        """Fetch data for all trading pairs"""
+        return {pair: df async for pair, df in self.stream_all_pairs_data(timeframe)}
     
     async def get_server_time(self) -> datetime:
         """Get Binance server time"""
@@ -1,193 +1,627 @@
 """
-Technical indicators calculator using ta library
+Technical indicators calculator (NumPy/numba kernels matching the ta library)
 """
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from functools import partial
 import numpy as np
 import pandas as pd
 from typing import Dict, Tuple, Optional
-import ta
 from config.settings import settings
+from core._njit import NUMBA_AVAILABLE
+from core._patterns_numba import detect_all as _detect_all_patterns
+from core._smoothing_numba import (
+    ewm_mean as _ewm_mean, ewm_mean_many as _ewm_mean_many, wilder_mean as _wilder_mean
+)
+
+PATTERN_COLUMNS = ('hammer', 'shooting_star', 'engulfing', 'morning_star', 'evening_star')
+INDICATOR_COLUMNS = (
+    'ema_20', 'ema_50', 'ema_200', 'rsi', 'adx', 'atr', 'macd', 'macd_signal',
+    'macd_hist', 'bb_upper', 'bb_middle', 'bb_lower', 'volume_ma'
+) + PATTERN_COLUMNS
+
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BB_PERIOD, BB_DEV = 20, 2
+VOLUME_MA_PERIOD = 20
+
+
+@dataclass
+class IndicatorState:
+    """Recurrence state of one (symbol, interval) series as of its last closed bar"""
+    timestamp: pd.Timestamp
+    bars: int
+    close: float
+    ema_fast: float
+    ema_slow_1: float
+    ema_slow_2: float
+    avg_gain: float
+    avg_loss: float
+    atr: float
+    macd_fast: float
+    macd_slow: float
+    macd_signal: float
+    high: float
+    low: float
+    adx_tr: float
+    adx_pos: float
+    adx_neg: float
+    adx: float
+    frame: pd.DataFrame
+    
+    @staticmethod
+    def _ema_step(value: float, previous: float, period: int) -> float:
+        alpha = 2.0 / (period + 1)
+        return alpha * value + (1 - alpha) * previous
+    
+    def advance(self, high: float, low: float, close: float) -> Dict[str, float]:
+        """Fold one bar into the state and return its EMA/RSI/ATR/MACD/ADX values"""
+        prev_close, prev_high, prev_low = self.close, self.high, self.low
+        self.bars += 1
+        self.close, self.high, self.low = close, high, low
+        
+        self.ema_fast = self._ema_step(close, self.ema_fast, settings.EMA_FAST)
+        self.ema_slow_1 = self._ema_step(close, self.ema_slow_1, settings.EMA_SLOW_1)
+        self.ema_slow_2 = self._ema_step(close, self.ema_slow_2, settings.EMA_SLOW_2)
+        
+        # Wilder smoothing, as in ta's RSIIndicator and AverageTrueRange
+        diff = close - prev_close
+        self.avg_gain += (max(diff, 0.0) - self.avg_gain) / settings.RSI_PERIOD
+        self.avg_loss += (max(-diff, 0.0) - self.avg_loss) / settings.RSI_PERIOD
+        true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        self.atr = (self.atr * (settings.ATR_PERIOD - 1) + true_range) / settings.ATR_PERIOD
+        
+        self.macd_fast = self._ema_step(close, self.macd_fast, MACD_FAST)
+        self.macd_slow = self._ema_step(close, self.macd_slow, MACD_SLOW)
+        macd = self.macd_fast - self.macd_slow if self.bars >= MACD_SLOW else np.nan
+        if not np.isnan(macd):
+            self.macd_signal = macd if np.isnan(self.macd_signal) else \
+                self._ema_step(macd, self.macd_signal, MACD_SIGNAL)
+        macd_signal = self.macd_signal if self.bars - MACD_SLOW + 1 >= MACD_SIGNAL else np.nan
+        
+        if self.bars < settings.RSI_PERIOD:
+            rsi = np.nan
+        elif self.avg_loss == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+        
+        # ADX Wilder sums and smoothing, in the operation order of calculate_adx;
+        # NaN until the state is seeded past ADX's warm-up
+        if not np.isnan(self.adx):
+            period = settings.ADX_PERIOD
+            up, down = high - prev_high, prev_low - low
+            adx_true_range = max(high, prev_close) - min(low, prev_close)
+            self.adx_tr = self.adx_tr - self.adx_tr / period + adx_true_range
+            self.adx_pos = self.adx_pos - self.adx_pos / period + (abs(up) if up > down and up > 0 else 0.0)
+            self.adx_neg = self.adx_neg - self.adx_neg / period + (abs(down) if down > up and down > 0 else 0.0)
+            di_pos = 100 * (self.adx_pos / self.adx_tr) if self.adx_tr != 0 else 0.0
+            di_neg = 100 * (self.adx_neg / self.adx_tr) if self.adx_tr != 0 else 0.0
+            total = di_pos + di_neg
+            dx = 100 * abs((di_pos - di_neg) / total) if total != 0 else 0.0
+            self.adx = ((self.adx * (period - 1)) + dx) / float(period)
+        
+        def masked(value: float, period: int) -> float:
+            return value if self.bars >= period else np.nan
+        
+        return {
+            'adx': self.adx,
+            'ema_20': masked(self.ema_fast, settings.EMA_FAST),
+            'ema_50': masked(self.ema_slow_1, settings.EMA_SLOW_1),
+            'ema_200': masked(self.ema_slow_2, settings.EMA_SLOW_2),
+            'rsi': rsi,
+            'atr': self.atr,
+            'macd': masked(macd, MACD_SLOW),
+            'macd_signal': macd_signal,
+            'macd_hist': macd - macd_signal
+        }
+
+
+@dataclass(frozen=True)
+class OHLCV:
+    """Columnar candle data: int64 millisecond open times and float64 prices"""
+    ts: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'OHLCV':
+        """Take the columns of an OHLCV DataFrame as arrays, without copying"""
+        if isinstance(df.index, pd.DatetimeIndex):
+            ts = df.index.asi8 // 1_000_000
+        else:
+            ts = np.arange(len(df), dtype=np.int64)
+        return cls(
+            ts=ts,
+            open=df['open'].to_numpy(dtype=np.float64),
+            high=df['high'].to_numpy(dtype=np.float64),
+            low=df['low'].to_numpy(dtype=np.float64),
+            close=df['close'].to_numpy(dtype=np.float64),
+            volume=df['volume'].to_numpy(dtype=np.float64)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.close)
+
+
+# Latest incremental state per (symbol, interval)
+_indicator_states: Dict[Tuple[str, str], IndicatorState] = {}
+# Pool threads advance states in place; overlapping scans of one series
+# (e.g. /signal during the periodic loop) must take turns
+_indicator_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+# Threads rather than processes so the incremental state stays shared; the
+# NumPy kernels release the GIL for most of their work
+_indicator_pool = ThreadPoolExecutor(
+    max_workers=settings.INDICATOR_WORKERS, thread_name_prefix='indicators'
+)
 
 
 class TechnicalIndicators:
     """Calculate technical indicators for trading signals"""
     
+    @staticmethod
+    def _ewm(values: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+        """ewm(alpha=alpha, min_periods=min_periods, adjust=False).mean() of an array"""
+        missing = np.isnan(values)
+        # Leading NaNs are skipped by pandas too; the kernel starts after them
+        start = int(missing.argmin()) if len(values) else 0
+        if not NUMBA_AVAILABLE or missing[start:].any():
+            # pandas' own loop is faster than an unjitted kernel and handles gaps
+            return pd.Series(values, copy=False).ewm(
+                alpha=alpha, min_periods=min_periods, adjust=False
+            ).mean().to_numpy()
+        out = np.full(len(values), np.nan)
+        _ewm_mean(values[start:], alpha, min_periods, out[start:])
+        return out
+    
     @staticmethod
     def calculate_ema(data: pd.Series, period: int) -> pd.Series:
-        """Calculate Exponential Moving Average"""
-        return ta.trend.EMAIndicator(data, window=period).ema_indicator()
+        """Calculate Exponential Moving Average (same output as ta's EMAIndicator)"""
+        ema = TechnicalIndicators._ewm(data.to_numpy(dtype=np.float64), 2.0 / (period + 1), period)
+        return pd.Series(ema, index=data.index, name=f'ema_{period}')
+    
+    @staticmethod
+    def calculate_emas(data: pd.Series, periods: Tuple[int, ...]) -> Tuple[pd.Series, ...]:
+        """Calculate several EMAs of one series in a single fused pass"""
+        c = data.to_numpy(dtype=np.float64)
+        if not NUMBA_AVAILABLE or not len(c) or np.isnan(c).any():
+            return tuple(TechnicalIndicators.calculate_ema(data, period) for period in periods)
+        
+        out = np.empty((len(periods), len(c)))
+        _ewm_mean_many(
+            c, np.array([2.0 / (period + 1) for period in periods]),
+            np.array(periods, dtype=np.int64), out
+        )
+        return tuple(
+            pd.Series(values, index=data.index, name=f'ema_{period}')
+            for period, values in zip(periods, out)
+        )
     
     @staticmethod
     def calculate_rsi(data: pd.Series, period: int = 14) -> pd.Series:
-        """Calculate Relative Strength Index"""
-        return ta.momentum.RSIIndicator(data, window=period).rsi()
+        """Calculate Relative Strength Index (same output as ta's RSIIndicator)"""
+        c = data.to_numpy(dtype=np.float64)
+        diff = np.concatenate(([np.nan], c[1:] - c[:-1]))
+        gain = TechnicalIndicators._ewm(np.where(diff > 0, diff, 0.0), 1 / period, period)
+        loss = TechnicalIndicators._ewm(-np.where(diff < 0, diff, 0.0), 1 / period, period)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(loss == 0, 100, 100 - (100 / (1 + gain / loss)))
+        return pd.Series(rsi, index=data.index, name='rsi')
     
     @staticmethod
     def calculate_adx(high: pd.Series, low: pd.Series, 
                       close: pd.Series, period: int = 14) -> pd.Series:
-        """Calculate Average Directional Index"""
-        return ta.trend.ADXIndicator(high, low, close, window=period).adx()
+        """Calculate Average Directional Index (same output as ta's ADXIndicator)"""
+        adx = TechnicalIndicators._adx_wilder(high, low, close, period)[0]
+        return pd.Series(adx, index=close.index, name='adx')
+    
+    @staticmethod
+    def _adx_wilder(high: pd.Series, low: pd.Series, close: pd.Series,
+                    period: int) -> Tuple[np.ndarray, ...]:
+        """ADX with its Wilder TR/+DM/-DM sums; sums[i] covers bars up to period + i"""
+        h = high.to_numpy(dtype=np.float64)
+        l = low.to_numpy(dtype=np.float64)
+        c = close.to_numpy(dtype=np.float64)
+        n = len(c)
+        size = n - (period - 1)
+        if size <= period:
+            empty = np.zeros(0)
+            return np.zeros(n), empty, empty, empty
+        
+        prev_close = np.concatenate(([np.nan], c[:-1]))
+        true_range = np.maximum(h, prev_close) - np.minimum(l, prev_close)
+        up = h - np.concatenate(([np.nan], h[:-1]))
+        down = np.concatenate(([np.nan], l[:-1])) - l
+        pos = np.where(np.isnan(up), np.nan, np.where((up > down) & (up > 0), np.abs(up), 0.0))
+        neg = np.where(np.isnan(down), np.nan, np.where((down > up) & (down > 0), np.abs(down), 0.0))
+        
+        # Wilder sums seeded from the first full window; like ta, the last
+        # slot is left at zero
+        trs, dip, din = np.zeros(size), np.zeros(size), np.zeros(size)
+        trs[0] = true_range[~np.isnan(true_range)][:period].sum()
+        dip[0] = pos[~np.isnan(pos)][:period].sum()
+        din[0] = neg[~np.isnan(neg)][:period].sum()
+        tr_list, pos_list, neg_list = true_range.tolist(), pos.tolist(), neg.tolist()
+        t, p, m = trs[0], dip[0], din[0]
+        for i in range(1, size - 1):
+            t = t - t / period + tr_list[period + i]
+            p = p - p / period + pos_list[period + i]
+            m = m - m / period + neg_list[period + i]
+            trs[i], dip[i], din[i] = t, p, m
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            di_pos = np.where(trs != 0, 100 * (dip / trs), 0.0)
+            di_neg = np.where(trs != 0, 100 * (din / trs), 0.0)
+            total = di_pos + di_neg
+            dx = np.where(total != 0, 100 * np.abs((di_pos - di_neg) / total), 0.0)
+        
+        adx = np.zeros(size)
+        adx[period] = dx[0:period].mean()
+        value = adx[period]
+        dx_list = dx.tolist()
+        for i in range(period + 1, size):
+            value = ((value * (period - 1)) + dx_list[i - 1]) / float(period)
+            adx[i] = value
+        
+        return np.concatenate((np.zeros(period - 1), adx)), trs, dip, din
     
     @staticmethod
     def calculate_atr(high: pd.Series, low: pd.Series, 
                       close: pd.Series, period: int = 14) -> pd.Series:
-        """Calculate Average True Range"""
-        return ta.volatility.AverageTrueRange(high, low, close, window=period).average_true_range()
+        """Calculate Average True Range (same output as ta's AverageTrueRange)"""
+        h = high.to_numpy(dtype=np.float64)
+        l = low.to_numpy(dtype=np.float64)
+        c = close.to_numpy(dtype=np.float64)
+        atr = np.zeros(len(c))
+        if len(c) < period:
+            return pd.Series(atr, index=close.index, name='atr')
+        
+        prev_close = np.concatenate(([np.nan], c[:-1]))
+        # fmax skips the missing first previous close, like ta's row-wise max
+        true_range = np.fmax(np.fmax(h - l, np.abs(h - prev_close)), np.abs(l - prev_close))
+        _wilder_mean(true_range, period, np.nanmean(true_range[:period]), atr)
+        return pd.Series(atr, index=close.index, name='atr')
     
     @staticmethod
     def calculate_macd(data: pd.Series) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """Calculate MACD"""
-        macd = ta.trend.MACD(data, window_slow=26, window_fast=12, window_sign=9)
+        fast, slow = TechnicalIndicators.calculate_emas(data, (MACD_FAST, MACD_SLOW))
+        macd = fast.to_numpy() - slow.to_numpy()
+        signal = TechnicalIndicators._ewm(macd, 2.0 / (MACD_SIGNAL + 1), MACD_SIGNAL)
         return (
-            macd.macd(),
-            macd.macd_signal(),
-            macd.macd_diff()
+            pd.Series(macd, index=data.index, name='macd'),
+            pd.Series(signal, index=data.index, name='macd_signal'),
+            pd.Series(macd - signal, index=data.index, name='macd_hist')
         )
     
     @staticmethod
     def calculate_bbands(data: pd.Series, period: int = 20) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """Calculate Bollinger Bands"""
-        bb = ta.volatility.BollingerBands(data, window=period, window_dev=2)
-        return (
-            bb.bollinger_hband(),
-            bb.bollinger_mavg(),
-            bb.bollinger_lband()
-        )
+        rolling = data.rolling(period, min_periods=period)
+        mavg = rolling.mean()
+        mstd = rolling.std(ddof=0)
+        return mavg + BB_DEV * mstd, mavg, mavg - BB_DEV * mstd
+    
+    @staticmethod
+    def _candle_parts(open_price: pd.Series, close: pd.Series,
+                      high: pd.Series, low: pd.Series) -> Tuple[np.ndarray, ...]:
+        """Return open/close arrays with candle body and shadow sizes"""
+        o = open_price.to_numpy(dtype=np.float64)
+        c = close.to_numpy(dtype=np.float64)
+        body = np.abs(c - o)
+        upper_shadow = high.to_numpy(dtype=np.float64) - np.maximum(c, o)
+        lower_shadow = np.minimum(c, o) - low.to_numpy(dtype=np.float64)
+        return o, c, body, upper_shadow, lower_shadow
     
     @staticmethod
     def detect_hammer(open_price: pd.Series, high: pd.Series, 
                       low: pd.Series, close: pd.Series) -> pd.Series:
         """Detect Hammer candlestick pattern"""
-        result = pd.Series(0, index=close.index)
-        for i in range(1, len(close)):
-            body = abs(close.iloc[i] - open_price.iloc[i])
-            lower_shadow = min(close.iloc[i], open_price.iloc[i]) - low.iloc[i]
-            upper_shadow = high.iloc[i] - max(close.iloc[i], open_price.iloc[i])
-            
-            if body > 0 and lower_shadow > 2 * body and upper_shadow < body and close.iloc[i] > open_price.iloc[i]:
-                result.iloc[i] = 100
-        return result
+        o, c, body, upper_shadow, lower_shadow = TechnicalIndicators._candle_parts(
+            open_price, close, high, low
+        )
+        hit = (body > 0) & (lower_shadow > 2 * body) & (upper_shadow < body) & (c > o)
+        hit[:1] = False
+        return pd.Series(np.where(hit, 100, 0), index=close.index)
     
     @staticmethod
     def detect_shooting_star(open_price: pd.Series, high: pd.Series,
                              low: pd.Series, close: pd.Series) -> pd.Series:
         """Detect Shooting Star pattern"""
-        result = pd.Series(0, index=close.index)
-        for i in range(1, len(close)):
-            body = abs(close.iloc[i] - open_price.iloc[i])
-            upper_shadow = high.iloc[i] - max(close.iloc[i], open_price.iloc[i])
-            lower_shadow = min(close.iloc[i], open_price.iloc[i]) - low.iloc[i]
-            
-            if body > 0 and upper_shadow > 2 * body and lower_shadow < body and close.iloc[i] < open_price.iloc[i]:
-                result.iloc[i] = 100
-        return result
+        o, c, body, upper_shadow, lower_shadow = TechnicalIndicators._candle_parts(
+            open_price, close, high, low
+        )
+        hit = (body > 0) & (upper_shadow > 2 * body) & (lower_shadow < body) & (c < o)
+        hit[:1] = False
+        return pd.Series(np.where(hit, 100, 0), index=close.index)
     
     @staticmethod
     def detect_engulfing(open_price: pd.Series, high: pd.Series,
                          low: pd.Series, close: pd.Series) -> pd.Series:
         """Detect Engulfing pattern"""
-        result = pd.Series(0, index=close.index)
-        for i in range(1, len(close)):
-            # Bullish engulfing
-            if (close.iloc[i] > open_price.iloc[i] and 
-                close.iloc[i-1] < open_price.iloc[i-1] and
-                close.iloc[i] >= open_price.iloc[i-1] and 
-                open_price.iloc[i] <= close.iloc[i-1]):
-                result.iloc[i] = 100
-            # Bearish engulfing
-            elif (close.iloc[i] < open_price.iloc[i] and 
-                  close.iloc[i-1] > open_price.iloc[i-1] and
-                  close.iloc[i] <= open_price.iloc[i-1] and 
-                  open_price.iloc[i] >= close.iloc[i-1]):
-                result.iloc[i] = -100
-        return result
+        o = open_price.to_numpy(dtype=np.float64)
+        c = close.to_numpy(dtype=np.float64)
+        result = np.zeros(len(c), dtype=np.int64)
+        
+        # Compare each candle (from the second on) with the one before it
+        o_prev, c_prev, o_cur, c_cur = o[:-1], c[:-1], o[1:], c[1:]
+        bullish = (c_cur > o_cur) & (c_prev < o_prev) & (c_cur >= o_prev) & (o_cur <= c_prev)
+        bearish = (c_cur < o_cur) & (c_prev > o_prev) & (c_cur <= o_prev) & (o_cur >= c_prev)
+        result[1:] = np.where(bullish, 100, np.where(bearish, -100, 0))
+        return pd.Series(result, index=close.index)
+    
+    @staticmethod
+    def _star_mask(open_price: pd.Series, close: pd.Series, bullish: bool) -> np.ndarray:
+        """Three-candle star reversal mask, aligned to the third candle"""
+        o = open_price.to_numpy(dtype=np.float64)
+        c = close.to_numpy(dtype=np.float64)
+        body = np.abs(c - o)
+        hit = np.zeros(len(c), dtype=bool)
+        
+        body1, body2, body3 = body[:-2], body[1:-1], body[2:]
+        if bullish:
+            direction = (c[:-2] < o[:-2]) & (c[2:] > o[2:])
+        else:
+            direction = (c[:-2] > o[:-2]) & (c[2:] < o[2:])
+        hit[2:] = direction & (body2 < 0.3 * body1) & (body3 > body1)
+        return hit
     
     @staticmethod
     def detect_morning_star(open_price: pd.Series, high: pd.Series,
                            low: pd.Series, close: pd.Series) -> pd.Series:
         """Detect Morning Star pattern"""
-        result = pd.Series(0, index=close.index)
-        for i in range(2, len(close)):
-            body1 = abs(close.iloc[i-2] - open_price.iloc[i-2])
-            body2 = abs(close.iloc[i-1] - open_price.iloc[i-1])
-            body3 = abs(close.iloc[i] - open_price.iloc[i])
-            
-            if (close.iloc[i-2] < open_price.iloc[i-2] and
-                body2 < 0.3 * body1 and
-                close.iloc[i] > open_price.iloc[i] and
-                body3 > body1):
-                result.iloc[i] = 100
-        return result
+        hit = TechnicalIndicators._star_mask(open_price, close, bullish=True)
+        return pd.Series(np.where(hit, 100, 0), index=close.index)
     
     @staticmethod
     def detect_evening_star(open_price: pd.Series, high: pd.Series,
                            low: pd.Series, close: pd.Series) -> pd.Series:
         """Detect Evening Star pattern"""
-        result = pd.Series(0, index=close.index)
-        for i in range(2, len(close)):
-            body1 = abs(close.iloc[i-2] - open_price.iloc[i-2])
-            body2 = abs(close.iloc[i-1] - open_price.iloc[i-1])
-            body3 = abs(close.iloc[i] - open_price.iloc[i])
-            
-            if (close.iloc[i-2] > open_price.iloc[i-2] and
-                body2 < 0.3 * body1 and
-                close.iloc[i] < open_price.iloc[i] and
-                body3 > body1):
-                result.iloc[i] = 100
-        return result
+        hit = TechnicalIndicators._star_mask(open_price, close, bullish=False)
+        return pd.Series(np.where(hit, 100, 0), index=close.index)
+    
+    @staticmethod
+    def detect_all_patterns(open_price: pd.Series, high: pd.Series,
+                            low: pd.Series, close: pd.Series) -> Dict[str, pd.Series]:
+        """Detect every candlestick pattern, in one fused pass when numba is available"""
+        if not NUMBA_AVAILABLE:
+            # The kernel would run as a Python loop; the NumPy detectors are faster
+            return {
+                'hammer': TechnicalIndicators.detect_hammer(open_price, high, low, close),
+                'shooting_star': TechnicalIndicators.detect_shooting_star(open_price, high, low, close),
+                'engulfing': TechnicalIndicators.detect_engulfing(open_price, high, low, close),
+                'morning_star': TechnicalIndicators.detect_morning_star(open_price, high, low, close),
+                'evening_star': TechnicalIndicators.detect_evening_star(open_price, high, low, close)
+            }
+        
+        n = len(close)
+        outputs = [np.zeros(n, dtype=np.int8) for _ in PATTERN_COLUMNS]
+        _detect_all_patterns(
+            open_price.to_numpy(dtype=np.float64), high.to_numpy(dtype=np.float64),
+            low.to_numpy(dtype=np.float64), close.to_numpy(dtype=np.float64),
+            *outputs
+        )
+        return {
+            name: pd.Series(values, index=close.index)
+            for name, values in zip(PATTERN_COLUMNS, outputs)
+        }
     
     @staticmethod
     def calculate_volume_ma(volume: pd.Series, period: int = 20) -> pd.Series:
         """Calculate Volume Moving Average"""
-        return ta.trend.SMAIndicator(volume, window=period).sma_indicator()
+        return volume.rolling(period, min_periods=period).mean().rename(f'sma_{period}')
     
     @staticmethod
-    def calculate_all_indicators(df: pd.DataFrame) -> pd.DataFrame:
-        """Calculate all required technical indicators"""
-        # EMAs
-        df['ema_20'] = TechnicalIndicators.calculate_ema(df['close'], settings.EMA_FAST)
-        df['ema_50'] = TechnicalIndicators.calculate_ema(df['close'], settings.EMA_SLOW_1)
-        df['ema_200'] = TechnicalIndicators.calculate_ema(df['close'], settings.EMA_SLOW_2)
+    def calculate_all_indicators(df: pd.DataFrame, symbol: Optional[str] = None,
+                                 interval: Optional[str] = None) -> pd.DataFrame:
+        """Calculate all required technical indicators
         
-        # RSI
-        df['rsi'] = TechnicalIndicators.calculate_rsi(df['close'], settings.RSI_PERIOD)
+        When symbol and interval are given, the EMA/RSI/ATR/MACD recurrences
+        continue from the previous call for that series and only bars newer
+        than its last closed bar are computed.
+        """
+        if symbol is None or interval is None:
+            return TechnicalIndicators._calculate_full(df)
         
-        # ADX
-        df['adx'] = TechnicalIndicators.calculate_adx(
-            df['high'], df['low'], df['close'], settings.ADX_PERIOD
+        key = (symbol, interval)
+        with _indicator_locks.setdefault(key, threading.Lock()):
+            state = _indicator_states.get(key)
+            if state is not None and TechnicalIndicators._can_advance(df, state):
+                df = TechnicalIndicators._calculate_incremental(df, state)
+            else:
+                df = TechnicalIndicators._calculate_full(df)
+                state = TechnicalIndicators._seed_state(df)
+                if state is None:
+                    _indicator_states.pop(key, None)
+                    return df
+            
+            state.frame = df[list(INDICATOR_COLUMNS)]
+            _indicator_states[key] = state
+        return df
+    
+    @staticmethod
+    async def calculate_all_indicators_async(df: pd.DataFrame, symbol: Optional[str] = None,
+                                             interval: Optional[str] = None) -> pd.DataFrame:
+        """Run calculate_all_indicators on the indicator thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _indicator_pool,
+            partial(TechnicalIndicators.calculate_all_indicators, df, symbol, interval)
+        )
+    
+    @staticmethod
+    def calculate_indicator_arrays(ohlcv: OHLCV) -> Dict[str, np.ndarray]:
+        """Calculate every indicator from columnar arrays, keyed by column name"""
+        open_price, high, low, close, volume = (
+            pd.Series(values, copy=False)
+            for values in (ohlcv.open, ohlcv.high, ohlcv.low, ohlcv.close, ohlcv.volume)
         )
         
-        # ATR
-        df['atr'] = TechnicalIndicators.calculate_atr(
-            df['high'], df['low'], df['close'], settings.ATR_PERIOD
+        ema_fast, ema_slow_1, ema_slow_2 = TechnicalIndicators.calculate_emas(
+            close, (settings.EMA_FAST, settings.EMA_SLOW_1, settings.EMA_SLOW_2)
         )
+        macd, macd_signal, macd_hist = TechnicalIndicators.calculate_macd(close)
+        bb_upper, bb_middle, bb_lower = TechnicalIndicators.calculate_bbands(close)
         
-        # MACD
-        df['macd'], df['macd_signal'], df['macd_hist'] = TechnicalIndicators.calculate_macd(df['close'])
+        columns = {
+            'ema_20': ema_fast,
+            'ema_50': ema_slow_1,
+            'ema_200': ema_slow_2,
+            'rsi': TechnicalIndicators.calculate_rsi(close, settings.RSI_PERIOD),
+            'adx': TechnicalIndicators.calculate_adx(high, low, close, settings.ADX_PERIOD),
+            'atr': TechnicalIndicators.calculate_atr(high, low, close, settings.ATR_PERIOD),
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_hist': macd_hist,
+            'bb_upper': bb_upper,
+            'bb_middle': bb_middle,
+            'bb_lower': bb_lower,
+            'volume_ma': TechnicalIndicators.calculate_volume_ma(volume),
+            **TechnicalIndicators.detect_all_patterns(open_price, high, low, close)
+        }
+        return {name: values.to_numpy() for name, values in columns.items()}
+    
+    @staticmethod
+    def _calculate_full(df: pd.DataFrame) -> pd.DataFrame:
+        """Calculate every indicator over the whole frame"""
+        arrays = TechnicalIndicators.calculate_indicator_arrays(OHLCV.from_frame(df))
+        return TechnicalIndicators._with_columns(df, arrays)
+    
+    @staticmethod
+    def _with_columns(df: pd.DataFrame, columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """Attach indicator columns with one concat instead of one insert per column"""
+        stale = df.columns.intersection(list(columns))
+        if len(stale):
+            df = df.drop(columns=stale)
+        return pd.concat(
+            [df, pd.DataFrame(columns, index=df.index, copy=False)], axis=1, copy=False
+        )
+    
+    @staticmethod
+    def _seed_state(df: pd.DataFrame) -> Optional[IndicatorState]:
+        """Capture recurrence state at the last closed bar of a fully computed frame"""
+        n = len(df)
+        if n <= settings.ATR_PERIOD + 1:
+            return None
         
-        # Bollinger Bands
-        df['bb_upper'], df['bb_middle'], df['bb_lower'] = TechnicalIndicators.calculate_bbands(df['close'])
+        close = df['close']
+        diff = close.diff()
+        anchor = n - 2
         
-        # Volume MA
-        df['volume_ma'] = TechnicalIndicators.calculate_volume_ma(df['volume'])
+        def ewm_at(series: pd.Series, **kwargs) -> float:
+            return float(series.ewm(adjust=False, **kwargs).mean().iloc[anchor])
         
-        # Candlestick Patterns
-        df['hammer'] = TechnicalIndicators.detect_hammer(
-            df['open'], df['high'], df['low'], df['close']
-        )
-        df['shooting_star'] = TechnicalIndicators.detect_shooting_star(
-            df['open'], df['high'], df['low'], df['close']
+        # ADX can be carried forward once its smoothing is past the seed window
+        period = settings.ADX_PERIOD
+        adx, trs, dip, din = TechnicalIndicators._adx_wilder(
+            df['high'], df['low'], close, period
         )
-        df['engulfing'] = TechnicalIndicators.detect_engulfing(
-            df['open'], df['high'], df['low'], df['close']
-        )
-        df['morning_star'] = TechnicalIndicators.detect_morning_star(
-            df['open'], df['high'], df['low'], df['close']
+        if anchor >= 2 * period - 1:
+            adx_state = trs[anchor - period], dip[anchor - period], din[anchor - period], adx[anchor]
+        else:
+            adx_state = np.nan, np.nan, np.nan, np.nan
+        
+        return IndicatorState(
+            timestamp=df.index[anchor],
+            bars=anchor + 1,
+            close=float(close.iloc[anchor]),
+            ema_fast=ewm_at(close, span=settings.EMA_FAST),
+            ema_slow_1=ewm_at(close, span=settings.EMA_SLOW_1),
+            ema_slow_2=ewm_at(close, span=settings.EMA_SLOW_2),
+            avg_gain=ewm_at(diff.where(diff > 0, 0.0), alpha=1 / settings.RSI_PERIOD),
+            avg_loss=ewm_at(-diff.where(diff < 0, 0.0), alpha=1 / settings.RSI_PERIOD),
+            atr=float(df['atr'].iloc[anchor]),
+            macd_fast=ewm_at(close, span=MACD_FAST),
+            macd_slow=ewm_at(close, span=MACD_SLOW),
+            macd_signal=ewm_at(df['macd'], span=MACD_SIGNAL),
+            high=float(df['high'].iloc[anchor]),
+            low=float(df['low'].iloc[anchor]),
+            adx_tr=float(adx_state[0]),
+            adx_pos=float(adx_state[1]),
+            adx_neg=float(adx_state[2]),
+            adx=float(adx_state[3]),
+            frame=df[list(INDICATOR_COLUMNS)]
         )
-        df['evening_star'] = TechnicalIndicators.detect_evening_star(
-            df['open'], df['high'], df['low'], df['close']
+    
+    @staticmethod
+    def _can_advance(df: pd.DataFrame, state: IndicatorState) -> bool:
+        """Check that df continues the series the state was built from"""
+        cached = state.frame.index
+        if len(df) < 3 or df.index[0] not in cached or df.index[-1] <= state.timestamp:
+            return False
+        
+        pos = df.index.searchsorted(state.timestamp)
+        offset = cached.get_loc(df.index[0])
+        return (
+            pos < len(df)
+            and df.index[pos] == state.timestamp
+            and offset + pos < len(cached)
+            and cached[offset + pos] == state.timestamp
+            and df['close'].iloc[pos] == state.close
         )
+    
+    @staticmethod
+    def _calculate_incremental(df: pd.DataFrame, state: IndicatorState) -> pd.DataFrame:
+        """Reuse cached rows up to the state's bar and advance it over the rest"""
+        n = len(df)
+        pos = df.index.searchsorted(state.timestamp)
+        offset = state.frame.index.get_loc(df.index[0])
         
-        return df
+        columns = {
+            col: np.empty(n) for col in INDICATOR_COLUMNS
+        }
+        for col, values in columns.items():
+            values[:pos + 1] = state.frame[col].to_numpy()[offset:offset + pos + 1]
+        
+        # Materialize the float64 columns once and share them with every kernel
+        ohlcv = OHLCV.from_frame(df)
+        high, low, close, volume = ohlcv.high, ohlcv.low, ohlcv.close, ohlcv.volume
+        
+        # Closed bars move the state forward; the still-forming last bar is
+        # evaluated on a copy so the next call can recompute it
+        for i in range(pos + 1, n):
+            target = state if i < n - 1 else replace(state)
+            for col, value in target.advance(high[i], low[i], close[i]).items():
+                columns[col][i] = value
+            if i < n - 1:
+                state.timestamp = df.index[i]
+            
+            if i + 1 >= BB_PERIOD:
+                window = close[i + 1 - BB_PERIOD:i + 1]
+                mavg, mstd = window.mean(), window.std()
+                columns['bb_middle'][i] = mavg
+                columns['bb_upper'][i] = mavg + BB_DEV * mstd
+                columns['bb_lower'][i] = mavg - BB_DEV * mstd
+            else:
+                columns['bb_middle'][i] = columns['bb_upper'][i] = columns['bb_lower'][i] = np.nan
+            columns['volume_ma'][i] = volume[i + 1 - VOLUME_MA_PERIOD:i + 1].mean() \
+                if i + 1 >= VOLUME_MA_PERIOD else np.nan
+        
+        # Patterns look back at most two bars
+        start = max(0, pos - 1)
+        for name, values in TechnicalIndicators.detect_all_patterns(*(
+            pd.Series(values[start:], copy=False)
+            for values in (ohlcv.open, high, low, close)
+        )).items():
+            columns[name][pos + 1:] = values.to_numpy()[pos + 1 - start:]
+        
+        # Frames too short to seed the ADX state are recomputed in full
+        if np.isnan(state.adx):
+            columns['adx'] = TechnicalIndicators.calculate_adx(
+                pd.Series(high, copy=False), pd.Series(low, copy=False),
+                pd.Series(close, copy=False), settings.ADX_PERIOD
+            ).to_numpy()
+        
+        return TechnicalIndicators._with_columns(df, {
+            col: values.astype(state.frame[col].dtype, copy=False)
+            for col, values in columns.items()
+        })
     
     @staticmethod
     def check_ema_cross(df: pd.DataFrame, fast_col: str = 'ema_50', 
@@ -196,10 +630,8 @@ class TechnicalIndicators:
         if len(df) < 2:
             return None
             
-        current_fast = df[fast_col].iloc[-1]
-        current_slow = df[slow_col].iloc[-1]
-        prev_fast = df[fast_col].iloc[-2]
-        prev_slow = df[slow_col].iloc[-2]
+        prev_fast, current_fast = df[fast_col].to_numpy()[-2:]
+        prev_slow, current_slow = df[slow_col].to_numpy()[-2:]
         
         if prev_fast <= prev_slow and current_fast > current_slow:
             return 'bullish'
@@ -215,8 +647,8 @@ class TechnicalIndicators:
         if len(df) < 5:
             return False
         
-        current_close = df['close'].iloc[-1]
-        ema_20 = df['ema_20'].iloc[-1]
+        current_close = df['close'].to_numpy()[-1]
+        ema_20 = df['ema_20'].to_numpy()[-1]
         
         price_diff_pct = abs(current_close - ema_20) / ema_20 * 100
         
@@ -239,19 +671,23 @@ class TechnicalIndicators:
     @staticmethod
     def detect_candlestick_pattern(df: pd.DataFrame, trend: str) -> Optional[str]:
         """Detect bullish or bearish candlestick pattern"""
+        hammer, shooting_star, engulfing, morning_star, evening_star = (
+            df[name].to_numpy()[-1] for name in PATTERN_COLUMNS
+        )
+        
         if trend == 'bullish':
-            if df['hammer'].iloc[-1] != 0:
+            if hammer != 0:
                 return 'hammer'
-            if df['engulfing'].iloc[-1] > 0:
+            if engulfing > 0:
                 return 'bullish_engulfing'
-            if df['morning_star'].iloc[-1] != 0:
+            if morning_star != 0:
                 return 'morning_star'
         else:
-            if df['shooting_star'].iloc[-1] != 0:
+            if shooting_star != 0:
                 return 'shooting_star'
-            if df['engulfing'].iloc[-1] < 0:
+            if engulfing < 0:
                 return 'bearish_engulfing'
-            if df['evening_star'].iloc[-1] != 0:
+            if evening_star != 0:
                 return 'evening_star'
         
         return None
@@ -259,10 +695,9 @@ class TechnicalIndicators:
     @staticmethod
     def calculate_support_resistance(df: pd.DataFrame, window: int = 20) -> Dict[str, float]:
         """Calculate recent support and resistance levels"""
-        recent_data = df.tail(window)
-        
-        resistance = recent_data['high'].max()
-        support = recent_data['low'].min()
+        # nanmax/nanmin skip missing bars like Series.max/min did
+        resistance = float(np.nanmax(df['high'].to_numpy()[-window:]))
+        support = float(np.nanmin(df['low'].to_numpy()[-window:]))
         
         return {
             'resistance': resistance,
@@ -3,7 +3,8 @@ Core signal generation engine
 """
 import asyncio
 import logging
-from typing import Optional, Dict, List
+from collections import deque
+from typing import Optional, Deque, Dict, List, Tuple
 from datetime import datetime, timedelta
 import pandas as pd
 
@@ -33,10 +34,15 @@ def get_telegram_bot():
 class SignalEngine:
     """Main signal generation and filtering engine"""
     
+    # (price floor, strike step) tiers, checked in order; anything at or
+    # below the last floor keeps cent precision
+    STRIKE_STEPS = ((1000, 50), (100, 10))
+    
     def __init__(self):
         self.running = False
-        self.signal_queue: List[Dict] = []
+        self.signal_queue: Deque[Dict] = deque(maxlen=settings.SIGNAL_QUEUE_SIZE)
         self.last_signal_time: Dict[str, datetime] = {}
+        self._btc_adx: Optional[Tuple[Tuple, float]] = None
         
     async def start(self):
         """Start signal generation engine"""
@@ -73,14 +79,34 @@ class SignalEngine:
             logger.info("High impact event near - skipping signals")
             return
         
+        # Pairs are independent; BinanceClient's weight budget and semaphore
+        # keep the fan-out within Binance's limits
+        results = await asyncio.gather(
+            *(self._analyze_pair(pair) for pair in settings.TRADING_PAIRS),
+            return_exceptions=True
+        )
+        
         signals = []
-        for pair in settings.TRADING_PAIRS:
-            try:
-                signal = await self._analyze_pair(pair)
-                if signal:
-                    signals.append(signal)
-            except Exception as e:
-                logger.error(f"Error analyzing {pair}: {e}")
+        for pair, result in zip(settings.TRADING_PAIRS, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error analyzing {pair}: {result}")
+            elif result:
+                signals.append(result)
+        
+        # One pass over BTC's returns serves every altcoin's correlation check
+        alt_pairs = [signal['pair'] for signal in signals if signal['pair'] != 'BTCUSDT']
+        if alt_pairs:
+            correlations = await binance_client.calculate_correlations(
+                'BTCUSDT', alt_pairs, days=7
+            )
+            passed = []
+            for signal in signals:
+                if signal['pair'] == 'BTCUSDT' or \
+                   self._check_correlation_filter(signal['pair'], correlations[signal['pair']]):
+                    passed.append(signal)
+                else:
+                    logger.info(f"{signal['pair']}: Failed correlation check")
+            signals = passed
         
         if signals:
             await self._process_signals(signals)
@@ -104,18 +130,19 @@ class SignalEngine:
             logger.info(f"Outside high conviction trading session")
             signal['confluence_score'] *= 0.8
         
-        if pair != 'BTCUSDT':
-            if not await self._check_correlation_filter(pair):
-                logger.info(f"{pair}: Failed correlation check")
-                return None
-        
         return signal
     
     async def _apply_market_filters(self, signal: Dict) -> bool:
         """Apply market context filters to signal"""
         pair = signal['pair']
         
-        funding_rate = await binance_client.get_funding_rate(pair)
+        # Independent endpoints; each getter already returns None/[] on failure
+        funding_rate, oi_data, liquidations = await asyncio.gather(
+            binance_client.get_funding_rate(pair),
+            binance_client.get_open_interest(pair),
+            binance_client.get_liquidations(pair)
+        )
+        
         if funding_rate:
             if abs(funding_rate) > settings.FUNDING_RATE_EXTREME:
                 logger.info(f"{pair}: Extreme funding rate {funding_rate:.4f}")
@@ -125,15 +152,13 @@ class SignalEngine:
                 else:
                     return False
         
-        oi_data = await binance_client.get_open_interest(pair)
         if oi_data:
             signal['open_interest'] = oi_data['open_interest']
         
-        liquidations = await binance_client.get_liquidations(pair)
         if liquidations:
-            recent_liqs = [l for l in liquidations 
-                          if l['time'] > datetime.utcnow() - timedelta(hours=1)]
-            if len(recent_liqs) > 10:
+            cutoff = datetime.utcnow() - timedelta(hours=1)
+            recent_liqs = sum(1 for l in liquidations if l['time'] > cutoff)
+            if recent_liqs > 10:
                 logger.info(f"{pair}: Liquidation cluster detected")
                 signal['confluence_score'] += 0.5
         
@@ -141,27 +166,30 @@ class SignalEngine:
     
     async def _check_market_conditions(self) -> bool:
         """Check overall market conditions"""
-        btc_data = await binance_client.get_klines('BTCUSDT', '4h', limit=50)
-        
-        from core.indicators import TechnicalIndicators
-        btc_data = TechnicalIndicators.calculate_all_indicators(btc_data)
-        
-        btc_adx = btc_data['adx'].iloc[-1]
+        # Same request as the strategy's BTCUSDT 4h fetch, so one cached REST
+        # call serves both; the filter still reads only the last 50 bars
+        btc_data = (await binance_client.get_klines('BTCUSDT', '4h', limit=200)).tail(50)
+        
+        # ADX is read off closed bars only, so it can only change when a new
+        # 4h bar closes; the last closed bar's open time keys the memo
+        key = ('BTCUSDT', '4h', btc_data.index[-2])
+        if self._btc_adx is None or self._btc_adx[0] != key:
+            from core.indicators import TechnicalIndicators
+            closed = await TechnicalIndicators.calculate_all_indicators_async(btc_data.iloc[:-1])
+            self._btc_adx = (key, float(closed['adx'].iloc[-1]))
+        
+        btc_adx = self._btc_adx[1]
         if btc_adx < settings.BTC_ADX_MIN:
             logger.info(f"BTC ADX too low: {btc_adx:.1f}")
             return False
         
         return True
     
-    async def _check_correlation_filter(self, pair: str) -> bool:
-        """Check correlation with BTC for altcoins"""
+    def _check_correlation_filter(self, pair: str, corr: float) -> bool:
+        """Check an altcoin's correlation with BTC"""
         if pair == 'BTCUSDT':
             return True
         
-        corr = await binance_client.calculate_correlation(
-            'BTCUSDT', pair, days=7
-        )
-        
         if abs(corr) > settings.BTC_CORRELATION_THRESHOLD:
             logger.info(f"{pair}: High correlation with BTC ({corr:.2f})")
         
@@ -224,12 +252,7 @@ class SignalEngine:
             strike = current_price * (1 - settings.OPTION_ATM_RANGE)
             strike_type = 'OTM'
         
-        if current_price > 1000:
-            strike = round(strike / 50) * 50
-        elif current_price > 100:
-            strike = round(strike / 10) * 10
-        else:
-            strike = round(strike, 2)
+        strike = self._round_strike(strike, current_price)
         
         expiry_days = 10
         expiry_date = datetime.utcnow() + timedelta(days=expiry_days)
@@ -244,10 +267,19 @@ class SignalEngine:
             'premium_estimate': premium_estimate
         }
     
+    @classmethod
+    def _round_strike(cls, strike: float, current_price: float) -> float:
+        """Round a strike to the listing step for the underlying's price tier"""
+        for floor, step in cls.STRIKE_STEPS:
+            if current_price > floor:
+                return (int(strike) + step // 2) // step * step
+        return round(strike, 2)
+    
     def get_pending_signals(self) -> List[Dict]:
         """Get pending signals from queue"""
-        signals = self.signal_queue.copy()
-        self.signal_queue.clear()
+        signals = []
+        while self.signal_queue:
+            signals.append(self.signal_queue.popleft())
         return signals
 
 
@@ -2,10 +2,13 @@
 WebSocket handler for real-time Binance data streaming
 """
 import asyncio
-import json
 import logging
-from typing import Dict, Callable, Optional
+import random
+from operator import itemgetter
+from typing import Dict, Callable, NamedTuple, Optional, Set
 from datetime import datetime
+import numpy as np
+import orjson
 import pandas as pd
 import websockets
 from collections import defaultdict
@@ -14,6 +17,84 @@ from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+KLINE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+# Kline payload fields read on every push, fetched in one C-level call
+KLINE_FIELDS = itemgetter('t', 'o', 'h', 'l', 'c', 'v', 'x', 'T')
+
+
+class Candle(NamedTuple):
+    """Latest kline of a stream; timestamp is the open time in ms"""
+    timestamp: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    is_closed: bool
+
+
+class KlineBuffer:
+    """Fixed-capacity ring of the most recent klines of one stream"""
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.open_time = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((capacity, len(KLINE_COLUMNS)), dtype=np.float32)
+        self.start = 0
+        self.count = 0
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    @property
+    def last_open_time(self) -> Optional[int]:
+        """Open time (ms) of the newest bar"""
+        if not self.count:
+            return None
+        return int(self.open_time[(self.start + self.count - 1) % self.capacity])
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, capacity: int) -> 'KlineBuffer':
+        """Seed a buffer from a REST klines frame"""
+        buffer = cls(capacity)
+        df = df.iloc[-capacity:]
+        n = len(df)
+        buffer.open_time[:n] = df.index.asi8 // 1_000_000
+        buffer.values[:n] = df[list(KLINE_COLUMNS)].to_numpy(dtype=np.float32)
+        buffer.count = n
+        return buffer
+    
+    def update(self, open_time: int, values: tuple):
+        """Update the forming bar, or append a new one and evict the oldest"""
+        last = self.last_open_time
+        if last is not None and open_time < last:
+            return
+        
+        if last is not None and open_time == last:
+            slot = (self.start + self.count - 1) % self.capacity
+        elif self.count < self.capacity:
+            slot = (self.start + self.count) % self.capacity
+            self.count += 1
+        else:
+            slot = self.start
+            self.start = (self.start + 1) % self.capacity
+        
+        self.open_time[slot] = open_time
+        self.values[slot] = values
+    
+    def snapshot(self, limit: int) -> pd.DataFrame:
+        """Copy the newest bars out in the same layout as a REST klines frame"""
+        n = min(limit, self.count)
+        slots = (self.start + np.arange(self.count - n, self.count)) % self.capacity
+        values = self.values[slots]
+        index = pd.DatetimeIndex(
+            (self.open_time[slots] * 1_000_000).view('datetime64[ns]'), name='timestamp'
+        )
+        return pd.DataFrame(
+            {col: values[:, i] for i, col in enumerate(KLINE_COLUMNS)},
+            index=index, copy=False
+        )
+
 
 class BinanceWebSocket:
     """WebSocket client for real-time Binance data"""
@@ -23,47 +104,82 @@ class BinanceWebSocket:
         self.connections: Dict[str, websockets.WebSocketClientProtocol] = {}
         self.callbacks: Dict[str, Callable] = {}
         self.running = False
-        self.reconnect_delay = 5
+        self.min_reconnect_delay = 5
+        self.reconnect_delay = self.min_reconnect_delay
         self.max_reconnect_delay = 60
-        self.latest_candles: Dict[str, Dict[str, pd.Series]] = defaultdict(dict)
+        self.latest_candles: Dict[str, Dict[str, Candle]] = defaultdict(dict)
+        # Live bars per kline stream, seeded from REST and kept current by pushes
+        self.kline_buffers: Dict[str, KlineBuffer] = {}
+        self.active_streams: Set[str] = set()
         
     async def connect(self, stream_name: str, callback: Callable):
         """Connect to a WebSocket stream"""
-        self.callbacks[stream_name] = callback
         url = f"{self.ws_endpoint}/{stream_name}"
-        logger.info(f"Connecting to WebSocket: {url}")
+        await self._run_connection(stream_name, url, {stream_name: callback}, combined=False)
+    
+    async def connect_combined(self, callbacks: Dict[str, Callable]):
+        """Connect to many streams over one combined-stream socket"""
+        # Combined streams are served from /stream rather than /ws
+        base = self.ws_endpoint.rsplit('/ws', 1)[0]
+        url = f"{base}/stream?streams={'/'.join(callbacks)}"
+        await self._run_connection('combined', url, callbacks, combined=True)
+    
+    async def _run_connection(self, name: str, url: str,
+                              callbacks: Dict[str, Callable], combined: bool):
+        """Keep one socket open, dispatching each message to its stream's callback"""
+        self.callbacks.update(callbacks)
+        logger.info(f"Connecting to WebSocket: {name} ({len(callbacks)} streams)")
         
         while self.running:
             try:
                 async with websockets.connect(url) as websocket:
-                    self.connections[stream_name] = websocket
-                    logger.info(f"WebSocket connected: {stream_name}")
+                    self.connections[name] = websocket
+                    self.active_streams.update(callbacks)
+                    logger.info(f"WebSocket connected: {name}")
                     
                     async for message in websocket:
                         if not self.running:
                             break
+                        # Only a socket that actually delivers data resets the backoff
+                        self.reconnect_delay = self.min_reconnect_delay
                         
                         try:
-                            data = json.loads(message)
-                            await callback(data)
+                            # orjson takes str or bytes frames without decoding
+                            data = orjson.loads(message)
+                            if combined:
+                                # Combined frames wrap the payload: {"stream": ..., "data": ...}
+                                callback = callbacks.get(data.get('stream'))
+                                data = data.get('data')
+                            else:
+                                callback = callbacks[name]
+                            if callback is not None and data is not None:
+                                await callback(data)
                         except Exception as e:
                             logger.error(f"Error processing message: {e}")
                     
             except websockets.exceptions.ConnectionClosed:
-                logger.warning(f"WebSocket connection closed: {stream_name}")
+                logger.warning(f"WebSocket connection closed: {name}")
             except Exception as e:
-                logger.error(f"WebSocket error for {stream_name}: {e}")
+                logger.error(f"WebSocket error for {name}: {e}")
+            
+            # Bars pushed while disconnected are lost; reseed from REST
+            self.connections.pop(name, None)
+            for stream_name in callbacks:
+                self.active_streams.discard(stream_name)
+                self.kline_buffers.pop(stream_name, None)
             
             if self.running:
-                logger.info(f"Reconnecting in {self.reconnect_delay} seconds...")
-                await asyncio.sleep(self.reconnect_delay)
+                # Jitter keeps reconnecting clients from hitting Binance in lockstep
+                delay = self.reconnect_delay * (0.5 + random.random())
+                logger.info(f"Reconnecting in {delay:.1f} seconds...")
+                await asyncio.sleep(delay)
                 self.reconnect_delay = min(
                     self.reconnect_delay * 2, 
                     self.max_reconnect_delay
                 )
     
-    async def subscribe_klines(self, symbol: str, interval: str):
-        """Subscribe to kline/candlestick updates"""
+    def _kline_callback(self, symbol: str, interval: str) -> Callable:
+        """Build the message handler of one kline stream"""
         stream_name = f"{symbol.lower()}@kline_{interval}"
         
         async def kline_callback(data: Dict):
@@ -71,41 +187,72 @@ class BinanceWebSocket:
                 return
             
             kline = data['k']
-            candle = pd.Series({
-                'timestamp': pd.to_datetime(kline['t'], unit='ms'),
-                'open': float(kline['o']),
-                'high': float(kline['h']),
-                'low': float(kline['l']),
-                'close': float(kline['c']),
-                'volume': float(kline['v']),
-                'is_closed': kline['x']
-            })
+            open_time, o, h, l, c, v, is_closed, close_time = KLINE_FIELDS(kline)
+            candle = Candle(
+                open_time, float(o), float(h), float(l), float(c), float(v), is_closed
+            )
             
-            key = f"{symbol}_{interval}"
             self.latest_candles[symbol][interval] = candle
             
-            if candle['is_closed']:
-                logger.debug(f"Candle closed: {symbol} {interval} @ {candle['close']}")
+            buffer = self.kline_buffers.get(stream_name)
+            if buffer is not None:
+                last = buffer.last_open_time
+                if last is not None and open_time > last + (close_time - open_time + 1):
+                    # A bar was skipped; drop the buffer so it is reseeded
+                    del self.kline_buffers[stream_name]
+                else:
+                    buffer.update(candle.timestamp, candle[1:6])
+            
+            if candle.is_closed:
+                logger.debug(f"Candle closed: {symbol} {interval} @ {candle.close}")
         
-        await self.connect(stream_name, kline_callback)
+        return kline_callback
+    
+    async def subscribe_klines(self, symbol: str, interval: str):
+        """Subscribe to kline/candlestick updates"""
+        stream_name = f"{symbol.lower()}@kline_{interval}"
+        await self.connect(stream_name, self._kline_callback(symbol, interval))
     
     async def subscribe_all_pairs(self, pairs: list, timeframes: list):
-        """Subscribe to multiple pairs and timeframes"""
-        tasks = []
-        
-        for pair in pairs:
-            for timeframe in timeframes:
-                task = asyncio.create_task(
-                    self.subscribe_klines(pair.lower(), timeframe)
-                )
-                tasks.append(task)
-        
-        await asyncio.gather(*tasks, return_exceptions=True)
+        """Subscribe to multiple pairs and timeframes over one combined stream"""
+        callbacks = {
+            f"{pair.lower()}@kline_{timeframe}": self._kline_callback(pair.lower(), timeframe)
+            for pair in pairs
+            for timeframe in timeframes
+        }
+        await self.connect_combined(callbacks)
     
-    def get_latest_candle(self, symbol: str, timeframe: str) -> Optional[pd.Series]:
+    def seed_klines(self, symbol: str, interval: str, df: pd.DataFrame):
+        """Start a live buffer from freshly fetched REST klines"""
+        stream_name = f"{symbol.lower()}@kline_{interval}"
+        if stream_name not in self.active_streams:
+            return
+        buffer = self.kline_buffers.get(stream_name)
+        if buffer is None or len(buffer) < len(df):
+            self.kline_buffers[stream_name] = KlineBuffer.from_frame(
+                df, settings.WS_KLINE_BUFFER_SIZE
+            )
+    
+    def get_klines(self, symbol: str, interval: str, limit: int) -> Optional[pd.DataFrame]:
+        """Snapshot of the live buffer, or None if it cannot serve the request"""
+        buffer = self.kline_buffers.get(f"{symbol.lower()}@kline_{interval}")
+        if buffer is None or len(buffer) < limit:
+            return None
+        return buffer.snapshot(limit)
+    
+    def get_latest_candle(self, symbol: str, timeframe: str) -> Optional[Candle]:
         """Get latest candle for a symbol and timeframe"""
         return self.latest_candles.get(symbol, {}).get(timeframe)
     
+    def get_last_price(self, symbol: str) -> Optional[float]:
+        """Last traded price from any connected kline stream of the symbol"""
+        # Every kline push carries the latest trade as the forming bar's close
+        prefix = f"{symbol.lower()}@kline_"
+        for interval, candle in self.latest_candles.get(symbol.lower(), {}).items():
+            if prefix + interval in self.active_streams:
+                return candle.close
+        return None
+    
     async def start(self):
         """Start WebSocket connections"""
         self.running = True
@@ -120,7 +267,7 @@ class BinanceWebSocket:
         self.running = False
         logger.info("Stopping WebSocket connections...")
         
-        for stream_name, ws in self.connections.items():
+        for stream_name, ws in list(self.connections.items()):
             try:
                 await ws.close()
                 logger.info(f"Closed WebSocket: {stream_name}")
@@ -128,6 +275,8 @@ class BinanceWebSocket:
                 logger.error(f"Error closing WebSocket {stream_name}: {e}")
         
         self.connections.clear()
+        self.active_streams.clear()
+        self.kline_buffers.clear()
 
 
 ws_handler = BinanceWebSocket()
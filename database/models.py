@@ -2,15 +2,18 @@
 Database models and schema for trading bot
 """
 from datetime import datetime
-from typing import Optional, Dict, Any
+from itertools import islice
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple
 from sqlalchemy import (
     create_engine, Column, Integer, String, Float, 
-    DateTime, Boolean, JSON, Text, Index
+    DateTime, Boolean, Text, Index
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
 import asyncpg
+import orjson
 from contextlib import asynccontextmanager
 
 from config.settings import settings
@@ -18,6 +21,40 @@ from config.settings import settings
 Base = declarative_base()
 
 
+def _encode_json(value: Any) -> str:
+    """Serialize a json parameter; numpy scalars from indicator frames included"""
+    return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+def _encode_jsonb(value: Any) -> bytes:
+    """Serialize a jsonb parameter in the binary wire format"""
+    # Binary jsonb is a version byte followed by the JSON text
+    return b'\x01' + orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _decode_jsonb(data: bytes) -> Any:
+    """Parse a binary jsonb value"""
+    return orjson.loads(data[1:])
+
+
+# Leading keywords of statements that take row locks
+WRITE_STATEMENTS = frozenset(('INSERT', 'UPDATE', 'DELETE', 'MERGE'))
+
+# market_data columns filled by Database.copy_market_data; records carry all
+# but created_at, with indicators as a dict for the jsonb codec
+MARKET_DATA_COPY_COLUMNS = (
+    'pair', 'timeframe', 'timestamp', 'open', 'high', 'low', 'close',
+    'volume', 'indicators', 'created_at'
+)
+
+
+def _paginate(rows: Iterable, page_size: int) -> Iterator[List]:
+    """Split rows into lists of at most page_size items"""
+    it = iter(rows)
+    while page := list(islice(it, page_size)):
+        yield page
+
+
 class Signal(Base):
     """Trading signal model"""
     __tablename__ = "signals"
@@ -44,7 +81,7 @@ class Signal(Base):
     confluence_score = Column(Float, nullable=False)
     
     setup_logic = Column(Text)
-    indicators = Column(JSON)
+    indicators = Column(JSONB)
     
     status = Column(String(20), default="PENDING")
     trade_type = Column(String(20), default="PAPER")
@@ -62,6 +99,7 @@ class Signal(Base):
     __table_args__ = (
         Index('idx_pair_timestamp', 'pair', 'timestamp'),
         Index('idx_status_timestamp', 'status', 'timestamp'),
+        Index('idx_signal_indicators', 'indicators', postgresql_using='gin'),
     )
 
 
@@ -107,7 +145,7 @@ class MarketData(Base):
     close = Column(Float, nullable=False)
     volume = Column(Float, nullable=False)
     
-    indicators = Column(JSON)
+    indicators = Column(JSONB)
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -123,7 +161,7 @@ class UserSettings(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(String(50), unique=True, nullable=False)
     
-    preferred_pairs = Column(JSON)
+    preferred_pairs = Column(JSONB)
     risk_per_trade = Column(Float, default=0.02)
     paper_trading_mode = Column(Boolean, default=True)
     
@@ -143,7 +181,10 @@ class Database:
     def __init__(self):
         self.engine = None
         self.session_maker = None
-        self.pool = None
+        # Writers queue on their own small pool rather than holding read
+        # connections while they wait on each other's row locks
+        self.read_pool = None
+        self.write_pool = None
         
     def initialize(self):
         """Initialize database connection"""
@@ -160,18 +201,41 @@ class Database:
         Base.metadata.create_all(self.engine)
         
     async def initialize_async(self):
-        """Initialize async database pool"""
-        self.pool = await asyncpg.create_pool(
+        """Initialize async read and write pools"""
+        self.read_pool = await asyncpg.create_pool(
             settings.DATABASE_URL,
-            min_size=5,
+            min_size=2,
             max_size=settings.DATABASE_POOL_SIZE,
-            command_timeout=60
+            command_timeout=60,
+            init=self._init_connection
+        )
+        # Writes are short; fail fast instead of queueing behind a stuck one
+        self.write_pool = await asyncpg.create_pool(
+            settings.DATABASE_URL,
+            min_size=1,
+            max_size=settings.DATABASE_WRITE_POOL_SIZE,
+            command_timeout=10,
+            init=self._init_connection
+        )
+    
+    @staticmethod
+    async def _init_connection(conn: asyncpg.Connection):
+        """Exchange JSON columns as Python objects, serialized with orjson"""
+        await conn.set_type_codec(
+            'jsonb', encoder=_encode_jsonb, decoder=_decode_jsonb,
+            schema='pg_catalog', format='binary'
+        )
+        # Tables created before the JSONB switch keep plain json columns
+        await conn.set_type_codec(
+            'json', encoder=_encode_json, decoder=orjson.loads,
+            schema='pg_catalog'
         )
         
     async def close_async(self):
-        """Close async database pool"""
-        if self.pool:
-            await self.pool.close()
+        """Close async database pools"""
+        for pool in (self.read_pool, self.write_pool):
+            if pool:
+                await pool.close()
     
     def get_session(self):
         """Get database session"""
@@ -179,24 +243,53 @@ class Database:
     
     @asynccontextmanager
     async def acquire(self):
-        """Acquire async database connection"""
-        async with self.pool.acquire() as connection:
+        """Acquire async database connection for reads"""
+        async with self.read_pool.acquire() as connection:
             yield connection
     
+    @asynccontextmanager
+    async def acquire_write(self):
+        """Acquire async database connection for writes"""
+        async with self.write_pool.acquire() as connection:
+            yield connection
+    
+    def _acquire_for(self, query: str):
+        """Acquire from the write pool for writes, else the read pool"""
+        if query.split(None, 1)[0].upper() in WRITE_STATEMENTS:
+            return self.acquire_write()
+        return self.acquire()
+    
     async def execute(self, query: str, *args) -> Any:
         """Execute async query"""
-        async with self.acquire() as conn:
+        async with self._acquire_for(query) as conn:
             return await conn.fetch(query, *args)
     
     async def execute_one(self, query: str, *args) -> Optional[Dict]:
         """Execute query and return one result"""
-        async with self.acquire() as conn:
+        async with self._acquire_for(query) as conn:
             return await conn.fetchrow(query, *args)
     
-    async def execute_many(self, query: str, args_list: list):
-        """Execute many queries"""
-        async with self.acquire() as conn:
-            await conn.executemany(query, args_list)
+    async def execute_many(self, query: str, args_list: Iterable, page_size: int = 1000):
+        """Execute a statement for many argument rows in one transaction"""
+        async with self.acquire_write() as conn:
+            async with conn.transaction():
+                # Prepared once; each page is pipelined without per-row round trips
+                statement = await conn.prepare(query)
+                for page in _paginate(args_list, page_size):
+                    await statement.executemany(page)
+    
+    async def copy_market_data(self, records: Iterable[Tuple]) -> int:
+        """Bulk-load candles into market_data with COPY instead of INSERTs"""
+        # created_at is a client-side ORM default, so COPY has to supply it
+        now = datetime.utcnow()
+        rows = [(*record, now) for record in records]
+        async with self.acquire_write() as conn:
+            await conn.copy_records_to_table(
+                MarketData.__tablename__,
+                records=rows,
+                columns=MARKET_DATA_COPY_COLUMNS
+            )
+        return len(rows)
 
 
 db = Database()
@@ -56,7 +56,8 @@ async def initialize_database():
     """Initialize database with error handling"""
     try:
         from database.models import db
-        db.initialize()
+        # create_all runs blocking DDL; keep the loop free for the health server
+        await asyncio.to_thread(db.initialize)
         await db.initialize_async()
         logger.info("✓ Database connected")
         return db
@@ -208,8 +209,8 @@ async def main():
         logger.error(traceback.format_exc())
         logger.info("⚠️  Continuing to run despite error...")
         
-        while True:
-            await asyncio.sleep(3600)
+        # Park until a signal exits the process; no periodic wakeups
+        await asyncio.Event().wait()
     
     finally:
         logger.info("\n🛑 Shutting down...")
@@ -238,6 +239,14 @@ if __name__ == "__main__":
         signal.signal(signal.SIGINT, signal_handler)
         signal.signal(signal.SIGTERM, signal_handler)
         
+        # libuv loop for the socket-heavy asyncpg/aiohttp/Telegram stack
+        try:
+            import uvloop
+            uvloop.install()
+            logger.info("Using uvloop event loop")
+        except ImportError:
+            pass
+        
         asyncio.run(main())
     
     except Exception as e:
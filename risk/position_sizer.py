@@ -49,48 +49,34 @@ class RiskManager:
         """Update daily trading statistics"""
         today = datetime.utcnow().date()
         
+        won = 1 if signal_result == 'win' else 0
+        lost = 1 if signal_result == 'loss' else 0
+        
+        # One upsert on the unique date instead of insert-then-update round
+        # trips; COALESCE covers rows created without the ORM's defaults
         query = """
-            INSERT INTO trading_stats (date, total_signals, signals_taken)
-            VALUES ($1, 0, 0)
-            ON CONFLICT (date) DO NOTHING
+            INSERT INTO trading_stats (
+                date, total_signals, signals_taken, wins, losses, consecutive_losses
+            )
+            VALUES ($1, $2, 0, $3, $4, $4)
+            ON CONFLICT (date) DO UPDATE
+            SET total_signals = COALESCE(trading_stats.total_signals, 0) + EXCLUDED.total_signals,
+                wins = COALESCE(trading_stats.wins, 0) + EXCLUDED.wins,
+                losses = COALESCE(trading_stats.losses, 0) + EXCLUDED.losses,
+                consecutive_losses = CASE
+                    WHEN EXCLUDED.wins > 0 THEN 0
+                    ELSE COALESCE(trading_stats.consecutive_losses, 0) + EXCLUDED.losses
+                END,
+                updated_at = NOW()
+            RETURNING consecutive_losses
         """
-        await db.execute(query, today)
-        
-        if signal_generated:
-            query = """
-                UPDATE trading_stats
-                SET total_signals = total_signals + 1,
-                    updated_at = NOW()
-                WHERE DATE(date) = $1
-            """
-            await db.execute(query, today)
-        
-        if signal_result == 'win':
-            query = """
-                UPDATE trading_stats
-                SET wins = wins + 1,
-                    consecutive_losses = 0,
-                    updated_at = NOW()
-                WHERE DATE(date) = $1
-            """
-            await db.execute(query, today)
-            
-        elif signal_result == 'loss':
-            query = """
-                UPDATE trading_stats
-                SET losses = losses + 1,
-                    consecutive_losses = consecutive_losses + 1,
-                    updated_at = NOW()
-                WHERE DATE(date) = $1
-                RETURNING consecutive_losses
-            """
-            result = await db.execute_one(query, today)
-            
-            if result and result['consecutive_losses'] >= settings.CONSECUTIVE_LOSS_PAUSE:
-                await self.pause_trading(
-                    f"{settings.CONSECUTIVE_LOSS_PAUSE} consecutive losses",
-                    hours=settings.PAUSE_DURATION_HOURS
-                )
+        result = await db.execute_one(query, today, int(signal_generated), won, lost)
+        
+        if lost and result and result['consecutive_losses'] >= settings.CONSECUTIVE_LOSS_PAUSE:
+            await self.pause_trading(
+                f"{settings.CONSECUTIVE_LOSS_PAUSE} consecutive losses",
+                hours=settings.PAUSE_DURATION_HOURS
+            )
     
     async def pause_trading(self, reason: str, hours: int = 24):
         """Pause trading for specified duration"""
@@ -1,6 +1,7 @@
 """
 EMA Pullback Strategy Implementation
 """
+import asyncio
 import logging
 from typing import Optional, Dict, Tuple
 from datetime import datetime, timedelta
@@ -16,22 +17,25 @@ logger = logging.getLogger(__name__)
 class EMAPullbackStrategy:
     """EMA Pullback trading strategy"""
     
+    # Higher timeframes first, matching the unpacking order in analyze_pair
+    TIMEFRAMES = ('4h', '1h', '15m', '5m')
+    
     def __init__(self):
         self.indicators = TechnicalIndicators()
         
+    async def _load_timeframe(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """Fetch klines for one timeframe and attach indicators"""
+        df = await binance_client.get_klines(symbol, timeframe, limit=200)
+        return await self.indicators.calculate_all_indicators_async(df, symbol, timeframe)
+    
     async def analyze_pair(self, symbol: str) -> Optional[Dict]:
         """Analyze a trading pair for signal"""
         try:
-            htf_data_4h = await binance_client.get_klines(symbol, '4h', limit=200)
-            htf_data_1h = await binance_client.get_klines(symbol, '1h', limit=200)
-            
-            ltf_data_15m = await binance_client.get_klines(symbol, '15m', limit=200)
-            ltf_data_5m = await binance_client.get_klines(symbol, '5m', limit=200)
-            
-            htf_data_4h = self.indicators.calculate_all_indicators(htf_data_4h)
-            htf_data_1h = self.indicators.calculate_all_indicators(htf_data_1h)
-            ltf_data_15m = self.indicators.calculate_all_indicators(ltf_data_15m)
-            ltf_data_5m = self.indicators.calculate_all_indicators(ltf_data_5m)
+            # Fetch all timeframes concurrently; each one's indicators start
+            # as soon as its klines arrive
+            htf_data_4h, htf_data_1h, ltf_data_15m, ltf_data_5m = await asyncio.gather(
+                *(self._load_timeframe(symbol, tf) for tf in self.TIMEFRAMES)
+            )
             
             trend = await self._check_trend(htf_data_4h, htf_data_1h)
             
@@ -53,7 +57,7 @@ class EMAPullbackStrategy:
                 logger.info(f"{symbol}: Low confluence score {confluence:.1f}")
                 return None
             
-            current_price = ltf_data_5m['close'].iloc[-1]
+            current_price = float(ltf_data_5m['close'].iloc[-1])
             
             levels = self._calculate_levels(
                 current_price, ltf_data_15m, trend
@@ -3,21 +3,34 @@ Telegram bot for signal distribution and interaction
 """
 import asyncio
 import logging
-from typing import Dict, Optional
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
 from datetime import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
 from telegram.ext import (
-    Application, CommandHandler, CallbackQueryHandler,
+    AIORateLimiter, Application, CommandHandler, CallbackQueryHandler,
     ContextTypes, MessageHandler, filters
 )
+from telegram.request import HTTPXRequest
 
-from config.settings import settings, SIGNAL_TEMPLATE
+from config.settings import (
+    settings, SIGNAL_TEMPLATE, STATS_TEMPLATE, SETTINGS_TEMPLATE,
+    PAPER_TEMPLATE, PAPER_TRADE_TEMPLATE
+)
 from core.signal_engine import signal_engine
 from risk.position_sizer import risk_manager
 from database.models import db, Signal
+from utils.helpers import escape_html
 
 logger = logging.getLogger(__name__)
 
+# Telegram rejects messages over 4096 characters; leave headroom for the
+# separators and the backpressure notice when merging plain messages
+MAX_MESSAGE_LENGTH = 3900
+MESSAGE_SEPARATOR = "\n━━━━━\n"
+
 
 class TradingBot:
     """Telegram trading bot"""
@@ -26,12 +39,40 @@ class TradingBot:
         self.application: Optional[Application] = None
         self.running = False
         self.paper_trades: Dict[str, Dict] = {}
+        self._outbox: asyncio.Queue = asyncio.Queue(maxsize=settings.TELEGRAM_QUEUE_SIZE)
+        self._backpressure = False
+        # Delivered ahead of the backlog it warns about
+        self._notice: Optional[Dict] = None
+        self._dropped = 0
+        self._background: Set[asyncio.Task] = set()
+        self._consumer: Optional[asyncio.Task] = None
+        self._settings_text: Optional[str] = None
+        self._recent_signals: "OrderedDict[str, float]" = OrderedDict()
 
     async def initialize(self):
         """Initialize Telegram bot"""
+        # One keep-alive pool for outbound sends and a separate small one for
+        # long polling, so getUpdates never starves signal delivery
+        request = HTTPXRequest(
+            connection_pool_size=32,
+            pool_timeout=10.0,
+            connect_timeout=5.0,
+            read_timeout=10.0
+        )
+        get_updates_request = HTTPXRequest(connection_pool_size=4)
+
         self.application = (
             Application.builder()
             .token(settings.TELEGRAM_BOT_TOKEN)
+            .request(request)
+            .get_updates_request(get_updates_request)
+            # Flood-waits are handled once in _send_with_retry; limiter
+            # retries on top of that would multiply the attempts per send
+            .rate_limiter(AIORateLimiter(
+                overall_max_rate=30,
+                overall_time_period=1,
+                max_retries=0
+            ))
             .build()
         )
 
@@ -56,11 +97,14 @@ class TradingBot:
         await self.application.updater.start_polling(drop_pending_updates=True)
         logger.info("Telegram bot started")
 
+        self._consumer = asyncio.create_task(self._drain())
         asyncio.create_task(self._broadcast_signals())
 
     async def stop(self):
         """Stop Telegram bot"""
         self.running = False
+        if self._consumer:
+            self._consumer.cancel()
         if self.application:
             await self.application.updater.stop()
             await self.application.stop()
@@ -70,11 +114,11 @@ class TradingBot:
     async def cmd_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
         welcome_message = """
-🚀 **Crypto Options Trading Signal Bot**
+🚀 <b>Crypto Options Trading Signal Bot</b>
 
 Welcome! This bot provides professional options trading signals for Delta Exchange based on technical analysis of Binance data.
 
-**Features:**
+<b>Features:</b>
 - Real-time market analysis
 - High-probability setups with confluence scoring
 - Risk-managed position sizing
@@ -83,14 +127,14 @@ Welcome! This bot provides professional options trading signals for Delta Exchan
 
 Use /help to see all available commands.
 
-⚠️ **Disclaimer:** Trading involves risk. These are signals for educational purposes. Always do your own research.
+⚠️ <b>Disclaimer:</b> Trading involves risk. These are signals for educational purposes. Always do your own research.
 """
-        await update.message.reply_text(welcome_message, parse_mode='Markdown')
+        await update.message.reply_text(welcome_message, parse_mode='HTML')
 
     async def cmd_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /help command"""
         help_text = """
-📚 **Available Commands:**
+📚 <b>Available Commands:</b>
 
 /start - Start the bot
 /help - Show this help message
@@ -99,18 +143,18 @@ Use /help to see all available commands.
 /settings - View current settings
 /paper - View paper trading results
 
-**Signal Actions:**
+<b>Signal Actions:</b>
 - MARKET ENTERED - Mark as real trade
 - PAPER TRADE - Track as paper trade
 - SKIP - Ignore this signal
 
-**Tips:**
+<b>Tips:</b>
 - Signals are checked every 15 minutes
 - Only high-quality setups (confluence ≥7) are sent
 - Max 3 signals per day
 - Pauses after 2 consecutive losses
 """
-        await update.message.reply_text(help_text, parse_mode='Markdown')
+        await update.message.reply_text(help_text, parse_mode='HTML')
 
     async def cmd_signal(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /signal command - manual signal check"""
@@ -131,48 +175,30 @@ Use /help to see all available commands.
         metrics_7d = await risk_manager.get_performance_metrics(days=7)
         metrics_30d = await risk_manager.get_performance_metrics(days=30)
 
-        stats_text = f"""
-📊 **Trading Statistics**
-
-**Last 7 Days:**
-- Total Signals: {metrics_7d['total_signals']}
-- Trades Taken: {metrics_7d['total_trades']}
-- Win Rate: {metrics_7d['win_rate']:.1f}%
-- Wins/Losses: {metrics_7d['wins']}/{metrics_7d['losses']}
-
-**Last 30 Days:**
-- Total Signals: {metrics_30d['total_signals']}
-- Trades Taken: {metrics_30d['total_trades']}
-- Win Rate: {metrics_30d['win_rate']:.1f}%
-- Profit Factor: {metrics_30d['avg_profit_factor']:.2f}
-- Max Drawdown: {metrics_30d['max_drawdown']:.1f}%
-
-📈 Updated: {datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}
-"""
-        await update.message.reply_text(stats_text, parse_mode='Markdown')
+        stats_text = STATS_TEMPLATE.format(
+            d7=metrics_7d,
+            d30=metrics_30d,
+            timestamp=datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')
+        )
+        await update.message.reply_text(stats_text, parse_mode='HTML')
 
     async def cmd_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /settings command"""
-        settings_text = f"""
-⚙️ **Current Settings**
-
-**Risk Management:**
-- Risk Per Trade: {settings.RISK_PER_TRADE * 100:.1f}%
-- Min Risk:Reward: 1:{settings.MIN_RISK_REWARD:.1f}
-- Max Daily Signals: {settings.MAX_DAILY_SIGNALS}
-- Consecutive Loss Pause: {settings.CONSECUTIVE_LOSS_PAUSE}
-
-**Signal Filters:**
-- Min Confluence Score: {settings.MIN_CONFLUENCE_SCORE}/10
-- ADX Threshold: {settings.ADX_THRESHOLD}
-- RSI Range: {settings.RSI_LOWER}-{settings.RSI_UPPER}
-
-**Trading Pairs:**
-{', '.join(settings.TRADING_PAIRS)}
-
-**Mode:** {'Testnet' if settings.BINANCE_TESTNET else 'Live'}
-"""
-        await update.message.reply_text(settings_text, parse_mode='Markdown')
+        if self._settings_text is None:
+            self._settings_text = SETTINGS_TEMPLATE.format(
+                risk_percent=settings.RISK_PER_TRADE * 100,
+                min_risk_reward=settings.MIN_RISK_REWARD,
+                max_daily_signals=settings.MAX_DAILY_SIGNALS,
+                loss_pause=settings.CONSECUTIVE_LOSS_PAUSE,
+                min_confluence=settings.MIN_CONFLUENCE_SCORE,
+                adx_threshold=settings.ADX_THRESHOLD,
+                rsi_lower=settings.RSI_LOWER,
+                rsi_upper=settings.RSI_UPPER,
+                pairs=escape_html(', '.join(settings.TRADING_PAIRS)),
+                mode='Testnet' if settings.BINANCE_TESTNET else 'Live'
+            )
+        settings_text = self._settings_text
+        await update.message.reply_text(settings_text, parse_mode='HTML')
 
     async def cmd_paper(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /paper command - show paper trades"""
@@ -194,24 +220,24 @@ Use /help to see all available commands.
         total_pnl = sum(t['pnl'] or 0 for t in trades)
         wins = sum(1 for t in trades if (t['pnl'] or 0) > 0)
 
-        paper_text = f"""
-📝 **Paper Trading Results** (Last 10 trades)
-
-**Summary:**
-- Total P&L: ${total_pnl:,.2f}
-- Win Rate: {wins/len(trades)*100:.1f}%
-
-**Recent Trades:**
-"""
-        for trade in trades:
-            pnl_emoji = "🟢" if (trade['pnl'] or 0) > 0 else "🔴"
-            paper_text += f"""
-{pnl_emoji} {trade['pair']} {trade['direction']}
-Entry: ${trade['entry_price']:.2f} | Exit: ${trade['exit_price']:.2f}
-P&L: ${trade['pnl']:.2f} | Reason: {trade['exit_reason']}
-"""
+        paper_text = PAPER_TEMPLATE.format(
+            total_pnl=total_pnl,
+            win_rate=wins / len(trades) * 100,
+            trades=''.join(
+                PAPER_TRADE_TEMPLATE.format(
+                    emoji="🟢" if (trade['pnl'] or 0) > 0 else "🔴",
+                    pair=escape_html(trade['pair']),
+                    direction=escape_html(trade['direction']),
+                    entry_price=trade['entry_price'],
+                    exit_price=trade['exit_price'],
+                    pnl=trade['pnl'],
+                    exit_reason=escape_html(trade['exit_reason'])
+                )
+                for trade in trades
+            )
+        )
 
-        await update.message.reply_text(paper_text, parse_mode='Markdown')
+        await update.message.reply_text(paper_text, parse_mode='HTML')
 
     async def button_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle button callbacks"""
@@ -290,7 +316,6 @@ P&L: ${trade['pnl']:.2f} | Reason: {trade['exit_reason']}
 
                 for signal in signals:
                     await self._send_signal(signal)
-                    await asyncio.sleep(2)
 
                 await asyncio.sleep(30)
 
@@ -298,13 +323,39 @@ P&L: ${trade['pnl']:.2f} | Reason: {trade['exit_reason']}
                 logger.error(f"Error broadcasting signals: {e}")
                 await asyncio.sleep(60)
 
+    def _is_duplicate_signal(self, signal: Dict) -> bool:
+        """Check whether an identical signal was sent recently, recording it if not"""
+        now = time.monotonic()
+
+        while self._recent_signals:
+            oldest = next(iter(self._recent_signals.values()))
+            if now - oldest < settings.SIGNAL_DEDUP_SECONDS:
+                break
+            self._recent_signals.popitem(last=False)
+
+        key = (
+            f"{signal['pair']}:{signal['direction']}:{signal['strike_price']}:"
+            f"{round(signal['entry_zone']['min'], 2)}"
+        )
+        if key in self._recent_signals:
+            return True
+
+        self._recent_signals[key] = now
+        if len(self._recent_signals) > settings.SIGNAL_DEDUP_MAX_ENTRIES:
+            self._recent_signals.popitem(last=False)
+        return False
+
     async def _send_signal(self, signal: Dict):
         """Send signal to Telegram with buttons"""
+        if self._is_duplicate_signal(signal):
+            logger.info(f"Skipping duplicate signal: {signal['pair']} {signal['direction']}")
+            return
+
         message_text = SIGNAL_TEMPLATE.format(
-            direction=signal['direction'].replace('_', ' '),
-            pair=signal['pair'],
+            direction=escape_html(signal['direction'].replace('_', ' ')),
+            pair=escape_html(signal['pair']),
             strike=signal['strike_price'],
-            strike_type=signal['strike_type'],
+            strike_type=escape_html(signal['strike_type']),
             expiry=signal['expiry_date'].strftime('%Y-%m-%d'),
             premium=signal['premium_estimate'],
             entry_min=signal['entry_zone']['min'],
@@ -313,7 +364,7 @@ P&L: ${trade['pnl']:.2f} | Reason: {trade['exit_reason']}
             tp1=signal['take_profits']['tp1'],
             tp2=signal['take_profits']['tp2'],
             tp3=signal['take_profits']['tp3'],
-            logic=signal['setup_logic'],
+            logic=escape_html(signal['setup_logic']),
             risk_amount=signal['position']['risk_amount'],
             risk_percent=signal['position']['risk_percent'],
             risk_reward=settings.MIN_RISK_REWARD,
@@ -343,7 +394,7 @@ P&L: ${trade['pnl']:.2f} | Reason: {trade['exit_reason']}
             signal['take_profits']['tp2'], signal['take_profits']['tp3'],
             signal['position']['risk_amount'], settings.MIN_RISK_REWARD,
             signal['confluence_score'], signal['setup_logic'],
-            str(signal['indicators']), signal['timestamp']
+            signal['indicators'], signal['timestamp']
         )
 
         signal_id = result['id']
@@ -359,23 +410,163 @@ P&L: ${trade['pnl']:.2f} | Reason: {trade['exit_reason']}
         ]
         reply_markup = InlineKeyboardMarkup(keyboard)
 
+        self.enqueue(
+            message_text,
+            reply_markup=reply_markup,
+            signal_id=signal_id,
+            description=f"{signal['pair']} {signal['direction']}"
+        )
+
+    def enqueue(self, text: str, reply_markup: Optional[InlineKeyboardMarkup] = None,
+                signal_id: Optional[int] = None, description: str = "message"):
+        """Queue a message for delivery without waiting on Telegram I/O"""
+        item = self._outbox_item(text, reply_markup, signal_id, description)
+
         try:
-            message = await self.application.bot.send_message(
-                chat_id=settings.TELEGRAM_CHAT_ID,
-                text=message_text,
-                parse_mode='Markdown',
-                reply_markup=reply_markup
+            self._outbox.put_nowait(item)
+        except asyncio.QueueFull:
+            dropped = self._outbox.get_nowait()
+            self._outbox.task_done()
+            self._record_drop(dropped)
+            self._outbox.put_nowait(item)
+
+        if not self._backpressure and \
+           self._outbox.qsize() >= settings.TELEGRAM_BACKPRESSURE_THRESHOLD:
+            self._backpressure = True
+            logger.warning(f"Telegram outbox backing up ({self._outbox.qsize()} queued)")
+            self._notice = self._outbox_item(
+                "⏳ Bot is catching up on queued alerts, older ones may be dropped",
+                description="backpressure notice"
             )
 
-            update_query = """
-                UPDATE signals SET telegram_message_id = $1 WHERE id = $2
-            """
-            await db.execute(update_query, str(message.message_id), signal_id)
+    @staticmethod
+    def _outbox_item(text: str, reply_markup: Optional[InlineKeyboardMarkup] = None,
+                     signal_id: Optional[int] = None, description: str = "message") -> Dict:
+        """Build one outbox entry for the configured chat"""
+        return {
+            'chat_id': settings.TELEGRAM_CHAT_ID,
+            'text': text,
+            'reply_markup': reply_markup,
+            'signal_id': signal_id,
+            'description': description
+        }
+
+    def _record_drop(self, item: Dict):
+        """Log a message evicted from the full outbox and flag its signal row"""
+        self._dropped += 1
+        if item['signal_id'] is None:
+            logger.warning(f"Telegram outbox full, dropped {item['description']}")
+            return
 
-            logger.info(f"Signal sent to Telegram: {signal['pair']} {signal['direction']}")
+        logger.warning(
+            f"Telegram outbox full, dropped signal #{item['signal_id']} ({item['description']})"
+        )
+        task = asyncio.create_task(self._mark_undelivered(item['signal_id']))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
 
+    async def _mark_undelivered(self, signal_id: int):
+        """Move a dropped signal out of PENDING so the table reflects what was sent"""
+        update_query = """
+            UPDATE signals SET status = 'UNDELIVERED' WHERE id = $1 AND status = 'PENDING'
+        """
+        try:
+            await db.execute(update_query, signal_id)
+        except Exception as e:
+            logger.error(f"Could not mark signal #{signal_id} undelivered: {e}")
+
+    async def _drain(self):
+        """Deliver queued messages to Telegram, merging runs of plain ones"""
+        held: Optional[Dict] = None
+        while True:
+            item = held if held is not None else await self._outbox.get()
+            batch = [item]
+            # Signals carry an inline keyboard and go out alone; a run of
+            # plain messages (alerts) shares one sendMessage
+            held = self._take_plain_run(batch) if self._is_plain(item) else None
+            taken = len(batch)
+            try:
+                # A notice is only raised with a backlog queued, so it is
+                # always picked up here ahead of the items just taken
+                if self._notice is not None:
+                    notice, self._notice = self._notice, None
+                    if self._is_plain(item):
+                        batch.insert(0, notice)
+                    else:
+                        await self._deliver_logged([notice])
+                await self._deliver_logged(batch)
+            finally:
+                for _ in range(taken):
+                    self._outbox.task_done()
+
+            if self._backpressure and held is None and self._outbox.empty():
+                self._backpressure = False
+                logger.info(f"Telegram outbox drained ({self._dropped} dropped so far)")
+
+    def _take_plain_run(self, batch: List[Dict]) -> Optional[Dict]:
+        """Move queued plain messages onto batch; return the first one that can't join"""
+        size = len(batch[0]['text'])
+        while not self._outbox.empty():
+            item = self._outbox.get_nowait()
+            size += len(MESSAGE_SEPARATOR) + len(item['text'])
+            if not self._is_plain(item) or \
+               item['chat_id'] != batch[0]['chat_id'] or size > MAX_MESSAGE_LENGTH:
+                return item
+            batch.append(item)
+        return None
+
+    @staticmethod
+    def _is_plain(item: Dict) -> bool:
+        """Whether a message can be merged: no keyboard and no signal row to update"""
+        return item['reply_markup'] is None and item['signal_id'] is None
+
+    async def _deliver_logged(self, batch: List[Dict]):
+        """Deliver a batch, logging rather than raising on failure"""
+        try:
+            await self._deliver(batch)
         except Exception as e:
             logger.error(f"Error sending Telegram message: {e}")
 
+    async def _deliver(self, batch: List[Dict]):
+        """Send one message, or a run of plain ones joined, and record its signal's id"""
+        item = batch[0]
+        message = await self._send_with_retry(
+            chat_id=item['chat_id'],
+            text=MESSAGE_SEPARATOR.join(queued['text'] for queued in batch),
+            parse_mode='HTML',
+            reply_markup=item['reply_markup']
+        )
+
+        if item['signal_id'] is not None:
+            update_query = """
+                UPDATE signals SET telegram_message_id = $1 WHERE id = $2
+            """
+            await db.execute(update_query, str(message.message_id), item['signal_id'])
+
+        logger.info(f"Sent to Telegram: {', '.join(queued['description'] for queued in batch)}")
+
+    async def _send_with_retry(self, **kwargs):
+        """Send a message, re-sending once after a flood-wait and retrying network errors"""
+        attempts = settings.TELEGRAM_SEND_ATTEMPTS
+        failures = 0
+        flood_waited = False
+        while True:
+            try:
+                return await self.application.bot.send_message(**kwargs)
+            except RetryAfter as e:
+                if flood_waited:
+                    raise
+                flood_waited = True
+                logger.warning(f"Telegram flood control, re-sending in {e.retry_after}s")
+                await asyncio.sleep(e.retry_after + 0.5)
+            except BadRequest:
+                # Permanent (bad entity, unknown chat, too long); resending cannot help
+                raise
+            except (TimedOut, NetworkError) as e:
+                failures += 1
+                if failures >= attempts:
+                    raise
+                logger.warning(f"Telegram send failed ({e}), retry {failures}/{attempts - 1}")
+                await asyncio.sleep(2 ** (failures - 1))
 
 telegram_bot = TradingBot()
\ No newline at end of file
@@ -1,16 +1,60 @@
 """
 Unit tests for trading bot
 """
+import importlib
+import importlib.util
+import os
+import sys
 import pytest
 import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import replace
 from datetime import datetime
+from types import SimpleNamespace
 import pandas as pd
 import numpy as np
 
-from config.settings import settings
-from core.indicators import TechnicalIndicators
+from config.settings import DEFAULT_DATABASE_URL, get_settings, settings
+from core.binance_client import BinanceClient, TokenBucket
+from core.indicators import OHLCV, TechnicalIndicators
+from core.signal_engine import SignalEngine
+from core.websocket_handler import KlineBuffer
+from database.models import Database, _decode_jsonb, _encode_json, _encode_jsonb
 from risk.position_sizer import RiskManager
 
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_telegram_bot_module():
+    """Load telegram/bot_telegram.py the way main.py does, by file path"""
+    # The repo's telegram/ package shadows python-telegram-bot on sys.path
+    if not hasattr(sys.modules.get('telegram'), 'Bot'):
+        sys.modules.pop('telegram', None)
+        saved = sys.path[:]
+        sys.path[:] = [p for p in sys.path if os.path.abspath(p or '.') != ROOT]
+        try:
+            importlib.import_module('telegram')
+        finally:
+            sys.path[:] = saved
+    
+    spec = importlib.util.spec_from_file_location(
+        'tg_bot_module', os.path.join(ROOT, 'telegram', 'bot_telegram.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeDB:
+    """Records queries instead of hitting Postgres"""
+    
+    def __init__(self):
+        self.queries = []
+    
+    async def execute(self, query, *args):
+        self.queries.append((' '.join(query.split()), args))
+        return []
+
 
 class TestTechnicalIndicators:
     """Test technical indicator calculations"""
@@ -51,6 +95,136 @@ class TestTechnicalIndicators:
         
         for col in required_columns:
             assert col in df_with_indicators.columns
+    
+    def test_indicator_arrays_match_frame(self):
+        """Test the array indicator API against the DataFrame API"""
+        arrays = self.indicators.calculate_indicator_arrays(OHLCV.from_frame(self.df))
+        frame = self.indicators.calculate_all_indicators(self.df.copy())
+        
+        for name, values in arrays.items():
+            assert len(values) == len(self.df)
+            np.testing.assert_array_equal(values, frame[name].to_numpy())
+    
+    def test_numpy_kernels_match_ta(self):
+        """Test the NumPy/numba indicator kernels against the ta library"""
+        ta = pytest.importorskip("ta")
+        high, low, close = self.df['high'], self.df['low'], self.df['close']
+        
+        for period in (20, 50, 200):
+            np.testing.assert_allclose(
+                self.indicators.calculate_ema(close, period),
+                ta.trend.EMAIndicator(close, window=period).ema_indicator()
+            )
+        np.testing.assert_allclose(
+            self.indicators.calculate_rsi(close, 14),
+            ta.momentum.RSIIndicator(close, window=14).rsi()
+        )
+        np.testing.assert_allclose(
+            self.indicators.calculate_atr(high, low, close, 14),
+            ta.volatility.AverageTrueRange(high, low, close, window=14).average_true_range()
+        )
+        np.testing.assert_allclose(
+            self.indicators.calculate_volume_ma(self.df['volume']),
+            ta.trend.SMAIndicator(self.df['volume'], window=20).sma_indicator()
+        )
+        
+        np.testing.assert_allclose(
+            self.indicators.calculate_adx(high, low, close, 14),
+            ta.trend.ADXIndicator(high, low, close, window=14).adx()
+        )
+        
+        macd = ta.trend.MACD(close, window_slow=26, window_fast=12, window_sign=9)
+        for ours, theirs in zip(self.indicators.calculate_macd(close),
+                                (macd.macd(), macd.macd_signal(), macd.macd_diff())):
+            np.testing.assert_allclose(ours, theirs)
+        
+        bb = ta.volatility.BollingerBands(close, window=20, window_dev=2)
+        for ours, theirs in zip(self.indicators.calculate_bbands(close),
+                                (bb.bollinger_hband(), bb.bollinger_mavg(), bb.bollinger_lband())):
+            np.testing.assert_allclose(ours, theirs)
+    
+    def test_incremental_indicators_match_full(self):
+        """Test incremental indicator updates against a full recalculation"""
+        dates = pd.date_range(start='2024-01-01', periods=260, freq='1H')
+        close = 40000 + np.cumsum(np.random.normal(0, 50, 260))
+        df = pd.DataFrame({
+            'open': close + np.random.normal(0, 10, 260),
+            'high': close + 60,
+            'low': close - 60,
+            'close': close,
+            'volume': np.random.uniform(100, 1000, 260)
+        }, index=dates)
+        
+        self.indicators.calculate_all_indicators(df.iloc[:-2].copy(), 'TESTUSDT', '1h')
+        incremental = self.indicators.calculate_all_indicators(df.copy(), 'TESTUSDT', '1h')
+        full = self.indicators.calculate_all_indicators(df.copy())
+        
+        for col in ['ema_20', 'ema_200', 'rsi', 'atr', 'macd_signal', 'bb_upper', 'volume_ma', 'adx']:
+            np.testing.assert_allclose(incremental[col], full[col], rtol=1e-9)
+    
+    def test_concurrent_incremental_updates(self):
+        """Test overlapping pool calls on one series each match a full recalculation"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        dates = pd.date_range(start='2024-01-01', periods=300, freq='1H')
+        close = 40000 + np.cumsum(np.random.normal(0, 50, 300))
+        df = pd.DataFrame({
+            'open': close + np.random.normal(0, 10, 300),
+            'high': close + 60,
+            'low': close - 60,
+            'close': close,
+            'volume': np.random.uniform(100, 1000, 300)
+        }, index=dates)
+        frames = [df.iloc[:n] for n in range(250, 300)]
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(
+                lambda frame: self.indicators.calculate_all_indicators(frame.copy(), 'RACEUSDT', '1h'),
+                frames
+            ))
+        
+        for frame, result in zip(frames, results):
+            full = self.indicators.calculate_all_indicators(frame.copy())
+            for col in ['ema_20', 'rsi', 'atr', 'macd_signal', 'adx']:
+                np.testing.assert_allclose(result[col], full[col], rtol=1e-9)
+    
+    def test_float32_klines_match_float64(self):
+        """Test indicators from float32-stored klines against float64 input"""
+        reference = self.indicators.calculate_all_indicators(self.df.copy())
+        narrowed = self.indicators.calculate_all_indicators(self.df.astype(np.float32))
+        
+        for name in ['ema_20', 'ema_50', 'rsi', 'adx', 'atr', 'macd', 'macd_signal',
+                     'macd_hist', 'bb_upper', 'bb_middle', 'bb_lower', 'volume_ma']:
+            assert narrowed[name].dtype == np.float64
+            np.testing.assert_allclose(narrowed[name], reference[name], rtol=1e-4, atol=1e-2)
+    
+    def test_detect_candlestick_patterns(self):
+        """Test vectorized candlestick pattern detection"""
+        candles = pd.DataFrame({
+            'open':  [110.0, 99.5,  100.0, 112.0, 113.0, 111.5],
+            'high':  [110.5, 100.0, 112.5, 112.6, 113.1, 113.0],
+            'low':   [99.5,  99.0,  99.8,  110.0, 111.4, 110.95],
+            'close': [100.0, 99.8,  112.0, 112.5, 111.5, 111.0]
+        })
+        args = (candles['open'], candles['high'], candles['low'], candles['close'])
+        
+        hammer = self.indicators.detect_hammer(*args)
+        
+        assert hammer.tolist() == [0, 0, 0, 100, 0, 0]
+        assert self.indicators.detect_shooting_star(*args).tolist() == [0, 0, 0, 0, 0, 100]
+        assert self.indicators.detect_engulfing(*args).tolist() == [0, 0, 0, 0, -100, 0]
+        assert self.indicators.detect_morning_star(*args).tolist() == [0, 0, 100, 0, 0, 0]
+        assert self.indicators.detect_evening_star(*args).tolist() == [0, 0, 0, 0, 0, 0]
+        assert list(hammer.index) == list(candles.index)
+    
+    def test_detect_all_patterns_matches_detectors(self):
+        """Test fused pattern detection against the individual detectors"""
+        args = (self.df['open'], self.df['high'], self.df['low'], self.df['close'])
+        patterns = self.indicators.detect_all_patterns(*args)
+        
+        for name, values in patterns.items():
+            expected = getattr(self.indicators, f'detect_{name}')(*args)
+            assert values.tolist() == expected.tolist()
 
 
 class TestRiskManager:
@@ -87,6 +261,37 @@ class TestRiskManager:
         assert is_valid is True
 
 
+class TestKlineBuffer:
+    """Test the live kline ring buffer"""
+    
+    def test_ring_buffer_updates_and_evicts(self):
+        """Test forming-bar updates, eviction and REST-shaped snapshots"""
+        minute = 60_000
+        index = pd.DatetimeIndex(
+            (np.arange(8, dtype=np.int64) * minute * 1_000_000).view('datetime64[ns]'),
+            name='timestamp'
+        )
+        df = pd.DataFrame(
+            {col: np.arange(8, dtype=np.float32) for col in ['open', 'high', 'low', 'close', 'volume']},
+            index=index
+        )
+        
+        buffer = KlineBuffer.from_frame(df, capacity=5)
+        assert len(buffer) == 5
+        assert buffer.last_open_time == 7 * minute
+        
+        for i in range(8, 13):
+            buffer.update(i * minute, (i,) * 5)
+        buffer.update(12 * minute, (99,) * 5)
+        buffer.update(3 * minute, (-1,) * 5)
+        
+        snapshot = buffer.snapshot(5)
+        assert snapshot['close'].tolist() == [8.0, 9.0, 10.0, 11.0, 99.0]
+        assert list(snapshot.index.asi8 // 1_000_000 // minute) == [8, 9, 10, 11, 12]
+        assert snapshot.index.name == 'timestamp'
+        assert buffer.snapshot(2)['close'].tolist() == [11.0, 99.0]
+
+
 def test_settings_validation():
     """Test configuration settings"""
     assert settings.validate() is True
@@ -96,12 +301,413 @@ def test_settings_validation():
     assert len(settings.TRADING_PAIRS) > 0
 
 
-if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
-```
 
----
+class TestTelegramOutbox:
+    """Test the bounded Telegram outbox"""
+    
+    def setup_method(self):
+        """Load the bot module against python-telegram-bot"""
+        self.module = load_telegram_bot_module()
+    
+    def test_full_outbox_drops_oldest_and_flags_signal(self, monkeypatch):
+        """Test drop-oldest on a full queue marks the dropped signal row"""
+        fake_db = FakeDB()
+        monkeypatch.setattr(self.module, 'db', fake_db)
+        
+        async def scenario():
+            bot = self.module.TradingBot()
+            for signal_id in range(settings.TELEGRAM_QUEUE_SIZE + 1):
+                bot.enqueue(f"signal {signal_id}", signal_id=signal_id)
+            await asyncio.sleep(0)
+            return bot
+        
+        bot = asyncio.run(scenario())
+        
+        assert bot._dropped == 1
+        assert bot._outbox.qsize() == settings.TELEGRAM_QUEUE_SIZE
+        assert bot._outbox.get_nowait()['signal_id'] == 1
+        assert len(fake_db.queries) == 1
+        query, args = fake_db.queries[0]
+        assert "status = 'UNDELIVERED'" in query and args == (0,)
+    
+    def test_backpressure_notice_first_and_rearmed(self):
+        """Test the notice precedes the backlog and re-arms once drained"""
+        async def scenario():
+            bot = self.module.TradingBot()
+            delivered = []
+            
+            async def deliver(batch):
+                delivered.extend(item['description'] for item in batch)
+            bot._deliver = deliver
+            
+            for i in range(settings.TELEGRAM_BACKPRESSURE_THRESHOLD):
+                bot.enqueue(f"alert {i}", description=f"alert {i}")
+            drain = asyncio.create_task(bot._drain())
+            await bot._outbox.join()
+            assert bot._backpressure is False
+            
+            for i in range(settings.TELEGRAM_BACKPRESSURE_THRESHOLD):
+                bot.enqueue(f"again {i}", description=f"again {i}")
+            assert bot._backpressure is True
+            await bot._outbox.join()
+            drain.cancel()
+            return delivered
+        
+        delivered = asyncio.run(scenario())
+        
+        threshold = settings.TELEGRAM_BACKPRESSURE_THRESHOLD
+        assert delivered[0] == "backpressure notice"
+        assert delivered[1:threshold + 1] == [f"alert {i}" for i in range(threshold)]
+        assert delivered[threshold + 1] == "backpressure notice"
+        assert len(delivered) == 2 * threshold + 2
+    
+    def test_plain_messages_coalesce_around_signals(self, monkeypatch):
+        """Test runs of plain messages share a send while signals go out alone"""
+        monkeypatch.setattr(self.module, 'db', FakeDB())
+        
+        async def scenario():
+            bot = self.module.TradingBot()
+            sent = []
+            
+            async def send_message(**kwargs):
+                sent.append(kwargs)
+                return SimpleNamespace(message_id=len(sent))
+            bot.application = SimpleNamespace(bot=SimpleNamespace(send_message=send_message))
+            
+            keyboard = self.module.InlineKeyboardMarkup(
+                [[self.module.InlineKeyboardButton("Skip", callback_data="skip_1")]]
+            )
+            bot.enqueue("alert a")
+            bot.enqueue("alert b")
+            bot.enqueue("signal", reply_markup=keyboard, signal_id=1)
+            bot.enqueue("alert c")
+            bot.enqueue("x" * self.module.MAX_MESSAGE_LENGTH)
+            drain = asyncio.create_task(bot._drain())
+            await bot._outbox.join()
+            drain.cancel()
+            return sent
+        
+        sent = asyncio.run(scenario())
+        
+        separator = self.module.MESSAGE_SEPARATOR
+        assert [message['text'] for message in sent[:3]] == [
+            f"alert a{separator}alert b", "signal", "alert c"
+        ]
+        assert sent[1]['reply_markup'] is not None
+        assert len(sent) == 4
+    
+    def test_send_retry_policy(self, monkeypatch):
+        """Test BadRequest is final, flood-waits re-send once, network errors retry"""
+        from telegram.error import BadRequest, NetworkError, RetryAfter
+        
+        sleeps = []
+        
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+        monkeypatch.setattr(asyncio, 'sleep', fake_sleep)
+        
+        def make_bot(errors):
+            calls = []
+            
+            async def send_message(**kwargs):
+                calls.append(kwargs)
+                if errors:
+                    raise errors.pop(0)
+                return 'sent'
+            
+            bot = self.module.TradingBot()
+            bot.application = type('App', (), {})()
+            bot.application.bot = type('Bot', (), {'send_message': staticmethod(send_message)})()
+            return bot, calls
+        
+        bot, calls = make_bot([BadRequest("Can't parse entities")])
+        with pytest.raises(BadRequest):
+            asyncio.run(bot._send_with_retry(text='x'))
+        assert len(calls) == 1 and sleeps == []
+        
+        bot, calls = make_bot([RetryAfter(3), RetryAfter(3)])
+        with pytest.raises(RetryAfter):
+            asyncio.run(bot._send_with_retry(text='x'))
+        assert len(calls) == 2 and sleeps == [3.5]
+        
+        sleeps.clear()
+        bot, calls = make_bot([NetworkError('reset'), NetworkError('reset')])
+        assert asyncio.run(bot._send_with_retry(text='x')) == 'sent'
+        assert len(calls) == 3 and sleeps == [1, 2]
+    
+    def test_duplicate_signals_expire_and_are_capped(self, monkeypatch):
+        """Test dedup entries expire after the TTL and old keys fall off the cap"""
+        now = [1000.0]
+        monkeypatch.setattr(self.module, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+        monkeypatch.setattr(self.module, 'settings', replace(settings, SIGNAL_DEDUP_MAX_ENTRIES=3))
+        bot = self.module.TradingBot()
+        
+        def signal(pair):
+            return {'pair': pair, 'direction': 'LONG_CALL', 'strike_price': 100,
+                    'entry_zone': {'min': 99.991}}
+        
+        assert bot._is_duplicate_signal(signal('BTCUSDT')) is False
+        assert bot._is_duplicate_signal(signal('BTCUSDT')) is True
+        
+        now[0] += settings.SIGNAL_DEDUP_SECONDS
+        assert bot._is_duplicate_signal(signal('BTCUSDT')) is False
+        
+        for pair in ('ETHUSDT', 'BNBUSDT', 'SOLUSDT'):
+            assert bot._is_duplicate_signal(signal(pair)) is False
+        assert len(bot._recent_signals) == 3
+        assert bot._is_duplicate_signal(signal('BTCUSDT')) is False
+
 
-## 📄 File 29: `logs/.gitkeep`
-```
-# This file keeps the logs directory in git
+class TestBinanceClient:
+    """Test request budgeting in the Binance client"""
+    
+    def setup_method(self):
+        """Create an unconnected client"""
+        self.client = BinanceClient()
+    
+    def test_response_weight_syncs_its_own_bucket(self):
+        """Test usage headers are charged to the API that sent them"""
+        from yarl import URL
+        
+        def response(url, used, retry_after=None):
+            headers = {'X-MBX-USED-WEIGHT-1M': str(used)}
+            if retry_after is not None:
+                headers['Retry-After'] = str(retry_after)
+            return type('Response', (), {'url': URL(url), 'headers': headers})()
+        
+        self.client._sync_response_weight(
+            response('https://fapi.binance.com/fapi/v1/openInterest', 2000)
+        )
+        assert self.client.futures_weight.tokens <= settings.BINANCE_FUTURES_RATE_LIMIT - 2000 + 1
+        assert self.client.spot_weight.tokens > settings.BINANCE_RATE_LIMIT - 1
+        
+        self.client._sync_response_weight(
+            response('https://api.binance.com/api/v3/ticker/24hr', 100, retry_after=30)
+        )
+        assert self.client.spot_weight.tokens < 0
+        assert self.client.futures_weight.tokens > 0
+    
+    def test_token_bucket_sync_clamps_and_goes_into_debt(self):
+        """Test server usage clamps the budget and Retry-After drives it negative"""
+        bucket = TokenBucket(1200)
+        bucket.sync(used_weight=1000)
+        assert 199 < bucket.tokens < 201
+        
+        bucket.sync(used_weight=100)
+        assert bucket.tokens < 201
+        
+        bucket.sync(retry_after=10)
+        assert bucket.tokens <= -10 * bucket.rate
+    
+    def test_cached_fetches_once_per_key_until_expiry(self):
+        """Test concurrent misses share one fetch and an expired entry refetches"""
+        calls = []
+        
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+        
+        async def scenario():
+            first = await asyncio.gather(*(
+                self.client._cached(('funding', 'BTCUSDT'), 60, fetch) for _ in range(5)
+            ))
+            expired = await asyncio.gather(*(
+                self.client._cached(('oi', 'BTCUSDT'), 0, fetch) for _ in range(2)
+            ))
+            return first, expired
+        
+        first, expired = asyncio.run(scenario())
+        
+        assert first == [1] * 5
+        assert len(calls) == 3
+        assert expired[0] != expired[1]
+    
+    def test_rate_limited_request_retries_transient_errors(self, monkeypatch):
+        """Test 5xx responses are retried and other 4xx errors raise at once"""
+        from binance.exceptions import BinanceAPIException
+        
+        async def no_sleep(delay):
+            pass
+        monkeypatch.setattr(asyncio, 'sleep', no_sleep)
+        
+        def api_error(status):
+            return BinanceAPIException(None, status, '{"code": -1, "msg": "error"}')
+        
+        calls = []
+        
+        async def flaky(errors):
+            calls.append(1)
+            if errors:
+                raise errors.pop(0)
+            return 'ok'
+        
+        assert asyncio.run(
+            self.client._rate_limited_request(flaky, [api_error(503), api_error(429)])
+        ) == 'ok'
+        assert len(calls) == 3
+        
+        calls.clear()
+        with pytest.raises(BinanceAPIException):
+            asyncio.run(self.client._rate_limited_request(flaky, [api_error(400)]))
+        assert len(calls) == 1
+        
+        calls.clear()
+        errors = [api_error(502) for _ in range(settings.BINANCE_REQUEST_ATTEMPTS)]
+        with pytest.raises(BinanceAPIException):
+            asyncio.run(self.client._rate_limited_request(flaky, errors))
+        assert len(calls) == settings.BINANCE_REQUEST_ATTEMPTS
+    
+    def test_pearson_pairs_returns_by_open_time(self):
+        """Test correlation aligns the two series on shared bar times"""
+        r1 = np.array([0.01, -0.02, 0.03, 0.005])
+        ts1 = np.array([1, 2, 3, 4])
+        # Same returns on bars 2-4, shifted by one bar and with an extra bar 5
+        r2 = np.array([-0.02, 0.03, 0.005, -0.5])
+        ts2 = np.array([2, 3, 4, 5])
+        
+        assert BinanceClient._pearson(r1, ts1, r2, ts2) == pytest.approx(1.0)
+        assert BinanceClient._pearson(r1, ts1, -r2, ts2) == pytest.approx(-1.0)
+        assert BinanceClient._pearson(r1, ts1, r2, np.array([4, 5, 6, 7])) == 0.0
+        assert BinanceClient._pearson(np.ones(4), ts1, r2, ts2) == 0.0
+
+
+class TestSignalEngine:
+    """Test signal engine helpers"""
+    
+    def test_round_strike_tiers(self):
+        """Test strikes round to each price tier's listing step"""
+        assert SignalEngine._round_strike(43026.0, 43000.0) == 43050
+        assert SignalEngine._round_strike(43024.0, 43000.0) == 43000
+        assert SignalEngine._round_strike(254.9, 250.0) == 250
+        assert SignalEngine._round_strike(255.0, 250.0) == 260
+        assert SignalEngine._round_strike(0.51234, 0.5) == 0.51
+    
+    def test_pending_signals_drain_in_order(self):
+        """Test the bounded queue drains oldest first and keeps the newest"""
+        engine = SignalEngine()
+        for i in range(settings.SIGNAL_QUEUE_SIZE + 2):
+            engine.signal_queue.append({'id': i})
+        
+        drained = engine.get_pending_signals()
+        
+        assert [s['id'] for s in drained[:2]] == [2, 3]
+        assert len(drained) == settings.SIGNAL_QUEUE_SIZE
+        assert engine.get_pending_signals() == []
+
+    
+    def test_btc_adx_memo_holds_for_the_closed_bar(self, monkeypatch):
+        """Test the market check recomputes ADX only when a 4h bar closes"""
+        module = sys.modules['core.signal_engine']
+        dates = pd.date_range(start='2024-01-01', periods=51, freq='4h')
+        bars = pd.DataFrame({
+            'open': np.linspace(40000, 45000, 51),
+            'high': np.linspace(40100, 45100, 51),
+            'low': np.linspace(39900, 44900, 51),
+            'close': np.linspace(40050, 45050, 51),
+            'volume': np.full(51, 500.0)
+        }, index=dates)
+        # The forming bar ticks, then a new bar opens and the 4h bar closes
+        ticked = bars.iloc[:50].copy()
+        ticked.iloc[-1, ticked.columns.get_loc('close')] += 250
+        frames = [bars.iloc[:50], ticked, bars.iloc[1:]]
+        current = [frames[0]]
+        
+        async def get_klines(symbol, interval, limit=500):
+            return current[0]
+        monkeypatch.setattr(module.binance_client, 'get_klines', get_klines)
+        
+        computed = []
+        original = TechnicalIndicators.calculate_all_indicators_async
+        
+        async def calculate(df, *args):
+            computed.append(df.index[-1])
+            return await original(df, *args)
+        monkeypatch.setattr(TechnicalIndicators, 'calculate_all_indicators_async', calculate)
+        
+        engine = SignalEngine()
+        results = []
+        for frame in frames:
+            current[0] = frame
+            results.append(asyncio.run(engine._check_market_conditions()))
+        
+        assert computed == [dates[48], dates[49]]
+        assert results[0] == results[1]
+        assert engine._btc_adx[0] == ('BTCUSDT', '4h', dates[49])
+
+
+class TestDatabase:
+    """Test the asyncpg helpers without a server"""
+    
+    def test_json_codecs_round_trip_numpy(self):
+        """Test the orjson codecs accept numpy scalars and frame jsonb correctly"""
+        payload = {'rsi': np.float32(55.5), 'adx': np.float64(30.25), 'bars': np.int64(3)}
+        
+        encoded = _encode_jsonb(payload)
+        assert encoded[:1] == b'\x01'
+        assert _decode_jsonb(encoded) == {'rsi': 55.5, 'adx': 30.25, 'bars': 3}
+        assert _encode_json(['BTCUSDT']) == '["BTCUSDT"]'
+    
+    def test_queries_route_to_read_or_write_pool(self):
+        """Test writes use the write pool and everything else the read pool"""
+        class FakePool:
+            def __init__(self, name):
+                self.name = name
+            
+            @asynccontextmanager
+            async def acquire(self):
+                yield SimpleNamespace(fetch=self._run, fetchrow=self._run)
+            
+            async def _run(self, query, *args):
+                return self.name
+        
+        database = Database()
+        database.read_pool, database.write_pool = FakePool('read'), FakePool('write')
+        
+        async def scenario():
+            return [
+                await database.execute("SELECT * FROM signals"),
+                await database.execute("\n    UPDATE signals SET status = 'SKIPPED'"),
+                await database.execute_one("INSERT INTO signals (pair) VALUES ($1) RETURNING id"),
+                await database.execute("delete from signals"),
+                await database.execute_one("SELECT 1"),
+            ]
+        
+        assert asyncio.run(scenario()) == ['read', 'write', 'write', 'write', 'read']
+
+
+class TestSettings:
+    """Test the environment-backed settings factory"""
+    
+    def test_database_url_defaults_when_unset(self, monkeypatch):
+        """Test the DATABASE_URL fallback is the default string"""
+        monkeypatch.delenv('DATABASE_URL', raising=False)
+        monkeypatch.setattr(sys.modules['config.settings'], 'load_dotenv', lambda: None)
+        get_settings.cache_clear()
+        try:
+            built = get_settings()
+        finally:
+            get_settings.cache_clear()
+        
+        assert built.DATABASE_URL == DEFAULT_DATABASE_URL
+    
+    def test_environment_overrides_are_parsed(self, monkeypatch):
+        """Test typed fields are converted from their environment strings"""
+        monkeypatch.setenv('DATABASE_POOL_SIZE', '25')
+        monkeypatch.setenv('BINANCE_TESTNET', 'False')
+        monkeypatch.setenv('RISK_PER_TRADE', '0.01')
+        monkeypatch.setattr(sys.modules['config.settings'], 'load_dotenv', lambda: None)
+        get_settings.cache_clear()
+        try:
+            built = get_settings()
+        finally:
+            get_settings.cache_clear()
+        
+        assert built.DATABASE_POOL_SIZE == 25
+        assert built.BINANCE_TESTNET is False
+        assert built.RISK_PER_TRADE == 0.01
+        assert built.get_binance_endpoint() == "https://api.binance.com/api"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,5 +1,5 @@
 """Utils module initialization"""
-from .helpers import setup_logging, validate_environment
+from .helpers import setup_logging, escape_html, validate_environment
 from .health_check import health_server
 
-__all__ = ["setup_logging", "validate_environment", "health_server"]
+__all__ = ["setup_logging", "escape_html", "validate_environment", "health_server"]
@@ -7,6 +7,8 @@ from typing import Any, Dict
 from datetime import datetime
 from pathlib import Path
 
+_HTML_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
 
 def setup_logging(log_level: str = "INFO", log_file: str = None):
     """Setup structured JSON logging"""
@@ -53,6 +55,11 @@ def setup_logging(log_level: str = "INFO", log_file: str = None):
     logging.getLogger('urllib3').setLevel(logging.WARNING)
 
 
+def escape_html(value: Any) -> str:
+    """Escape a dynamic value for Telegram HTML parse mode"""
+    return str(value).translate(_HTML_ESCAPE)
+
+
 def validate_environment() -> Dict[str, Any]:
     """Validate environment variables and configuration"""
     from config.settings import settings